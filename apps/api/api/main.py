@@ -1,10 +1,21 @@
 # apps/api/api/main.py
 
+import asyncio
+import logging
+import os
+
 from fastapi import FastAPI
+from pymongo.errors import PyMongoError
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-
-from mongodb_serve.client import get_client, get_database, ping
+from prometheus_client import REGISTRY
+
+from mongodb_serve.client import get_client, get_database, ping, pool_metrics, warm_pool
+from mongodb_serve.metrics import PoolCollector
+from mongodb_serve.properties.changes import PropertyChangeWatcher
+from mongodb_serve.properties.indexes import check_index_drift, ensure_comment_indexes, ensure_property_indexes
+from . import properties
+from .metrics import PrometheusMiddleware, metrics_response
 from .properties import router as properties_router, init_property_service
 
 # -------------------------------------------------------------------
@@ -12,6 +23,8 @@ from .properties import router as properties_router, init_property_service
 # -------------------------------------------------------------------
 load_dotenv(dotenv_path="../../.env")
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # FastAPI App
 # -------------------------------------------------------------------
@@ -35,11 +48,32 @@ app.add_middleware(
     allow_headers=["*"],     # Authorization, Content-Type, etc.
 )
 
+# -------------------------------------------------------------------
+# Metrics
+# -------------------------------------------------------------------
+# Added last so request timings include the other middleware
+app.add_middleware(PrometheusMiddleware)
+REGISTRY.register(PoolCollector(pool_metrics))
+
 # -------------------------------------------------------------------
 # Database & Services
 # -------------------------------------------------------------------
 database = get_database()
-init_property_service(database)
+# Set PROPERTY_TRUSTED_READS=true to skip re-validating documents on read
+init_property_service(
+    database,
+    trusted=os.getenv("PROPERTY_TRUSTED_READS", "false").lower() == "true",
+    cache_size=int(os.getenv("PROPERTY_CACHE_SIZE", "1024")),
+    cache_ttl=float(os.getenv("PROPERTY_CACHE_TTL", "60")),
+    query_cache_size=int(os.getenv("PROPERTY_QUERY_CACHE_SIZE", "20000")),
+    query_cache_ttl=float(os.getenv("PROPERTY_QUERY_CACHE_TTL", "10")),
+    cluster_cache_size=int(os.getenv("PROPERTY_CLUSTER_CACHE_SIZE", "4096")),
+    cluster_cache_ttl=float(os.getenv("PROPERTY_CLUSTER_CACHE_TTL", "60")),
+    count_cache_size=int(os.getenv("PROPERTY_COUNT_CACHE_SIZE", "1024")),
+    count_cache_ttl=float(os.getenv("PROPERTY_COUNT_CACHE_TTL", "30")),
+    counter_flush_interval=float(os.getenv("PROPERTY_VIEW_FLUSH_INTERVAL", "1")),
+    embedded_comments=int(os.getenv("PROPERTY_EMBEDDED_COMMENTS", "5")),
+)
 
 # -------------------------------------------------------------------
 # Routers
@@ -56,17 +90,139 @@ def root():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
+
 @app.get("/health/db")
 async def db_health():
     ok = await ping()
     return {"mongodb": "ok" if ok else "down"}
 
+
+@app.get("/health/pool")
+def pool_health():
+    return pool_metrics.stats()
+
+
+@app.get("/health/counters")
+def counters_health():
+    return {"views": properties.property_service.counters.stats()}
+
+
+@app.get("/health/cache")
+def cache_health():
+    service = properties.property_service
+    return {
+        "property_by_id": service.cache.stats(),
+        "property_queries": service.query_cache.stats(),
+        "property_clusters": service.cluster_cache.stats(),
+        "property_counts": service.count_cache.stats(),
+        "suggestions": service.suggestions.stats(),
+        "similar_properties": service.similar_index.stats() if service.similar_index else None,
+    }
+
+# -------------------------------------------------------------------
+# Startup Handler
+# -------------------------------------------------------------------
+
+
+@app.on_event("startup")
+async def warm_connection_pool():
+    # Opens minPoolSize connections (MONGODB_MIN_POOL_SIZE or the URI) before traffic arrives
+    try:
+        opened = await warm_pool()
+        logger.info("MongoDB connection pool warmed: %d connections open", opened)
+    except PyMongoError as e:
+        logger.warning("Could not warm the MongoDB connection pool: %s", e)
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    # Set MONGODB_ENSURE_INDEXES=false to manage indexes with the CLI instead
+    if os.getenv("MONGODB_ENSURE_INDEXES", "true").lower() != "true":
+        return
+    # An unreachable database or conflicting index must not stop the API from starting
+    try:
+        await ensure_property_indexes(database.properties)
+        await ensure_comment_indexes(database.property_comments)
+        drift = await check_index_drift(database.properties)
+    except PyMongoError as e:
+        logger.warning("Could not ensure MongoDB indexes: %s", e)
+        return
+    if drift.has_drift:
+        logger.warning(
+            "properties index drift: missing=%s unexpected=%s mismatched=%s",
+            drift.missing, drift.unexpected, drift.mismatched)
+
+
+@app.on_event("startup")
+async def watch_property_changes():
+    # Keeps this worker's caches in sync with writes made by other workers
+    if os.getenv("PROPERTY_CACHE_CHANGE_STREAM", "true").lower() != "true":
+        return
+    watcher = PropertyChangeWatcher(
+        properties.property_service,
+        database.change_stream_tokens,
+        name=os.getenv("PROPERTY_CACHE_CHANGE_STREAM_NAME", "properties-cache"),
+    )
+    app.state.property_change_watcher = asyncio.create_task(watcher.run())
+
+
+async def refresh_periodically(refresh, interval: float, what: str):
+    # Rebuilds pick up other workers' writes and drop deleted properties
+    while True:
+        try:
+            await refresh()
+        except Exception:
+            # Any failure waits for the next interval; ending the loop would
+            # leave the index stale for the rest of the process
+            logger.exception("Could not refresh %s", what)
+        await asyncio.sleep(interval)
+
+
+@app.on_event("startup")
+async def start_suggestion_refresh():
+    # PROPERTY_SUGGEST_REFRESH_INTERVAL=0 disables autocomplete suggestions
+    interval = float(os.getenv("PROPERTY_SUGGEST_REFRESH_INTERVAL", "600"))
+    if interval > 0:
+        app.state.property_suggestion_refresh = asyncio.create_task(refresh_periodically(
+            properties.property_service.refresh_suggestions, interval, "property suggestions"))
+
+
+@app.on_event("startup")
+async def start_similarity_refresh():
+    # PROPERTY_SIMILAR_REFRESH_INTERVAL=0 disables /properties/{id}/similar;
+    # rebuilding also refits feature scaling as prices drift
+    interval = float(os.getenv("PROPERTY_SIMILAR_REFRESH_INTERVAL", "3600"))
+    if interval > 0:
+        app.state.property_similarity_refresh = asyncio.create_task(refresh_periodically(
+            properties.property_service.refresh_similarity_index, interval, "similar property index"))
+
+
+@app.on_event("startup")
+async def start_view_counter_buffer():
+    # PROPERTY_VIEW_FLUSH_INTERVAL=0 writes every view immediately instead
+    service = properties.property_service
+    if service.counters.flush_interval > 0:
+        service.counters.start()
+
 # -------------------------------------------------------------------
 # Shutdown Handler
 # -------------------------------------------------------------------
 
 
 @app.on_event("shutdown")
-def shutdown_db():
+async def shutdown_db():
+    for name in ("property_change_watcher", "property_suggestion_refresh", "property_similarity_refresh"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    # Write buffered view counts before the connection goes away
+    await properties.property_service.counters.stop()
+
     client = get_client()
     client.close()
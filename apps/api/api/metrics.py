@@ -0,0 +1,61 @@
+"""
+Prometheus metrics for HTTP requests, served at /metrics with the MongoDB
+command and connection pool metrics.
+
+Requests are labelled with their route template (``/properties/{property_id}``)
+rather than the raw path, so label values stay bounded; requests that match no
+route are labelled "unmatched". The route is only known once routing has run,
+so in-flight requests are labelled by method alone.
+"""
+
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by response status", ["method", "route", "status"],
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"],
+)
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # unless a response starts before an error
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            REQUESTS.labels(method, route, str(status)).inc()
+            in_progress.dec()
+
+
+def metrics_response() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
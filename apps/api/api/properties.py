@@ -1,7 +1,39 @@
-from fastapi import APIRouter, Query, HTTPException
-from typing import List, Optional
-from mongodb_serve.properties.service import PropertyService
-from mongodb_serve.properties.models import Property, PropertyCreate, PropertyUpdate
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Body, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from mongodb_serve.properties.service import EXPORT_BATCH_SIZE, PropertyService
+from mongodb_serve.properties.models import (
+    BulkResult,
+    CommentCreate,
+    CommentPage,
+    MapMarkers,
+    MarkerCluster,
+    NearbyProperty,
+    Property,
+    PropertyComment,
+    PropertyCreate,
+    PropertyFacets,
+    PropertyPage,
+    PropertySummary,
+    PropertySummaryPage,
+    PropertyUpdate,
+    SearchResult,
+    SimilarProperty,
+    Suggestion,
+)
+from mongodb_serve.properties.geo import check_box
+from mongodb_serve.properties.pagination import InvalidCursorError
+from mongodb_serve.properties.projections import (
+    SUMMARY_PROJECTION,
+    SUMMARY_STAGE,
+    UnknownFieldError,
+    sparse_projection,
+)
+from mongodb_serve.properties.serialization import apply_defaults, dumps, strip_internal
+
+logger = logging.getLogger(__name__)
 
 # Create router for properties endpoints
 router = APIRouter()
@@ -9,16 +41,40 @@ router = APIRouter()
 # Note: PropertyService should be initialized with database in main.py
 property_service: Optional[PropertyService] = None
 
+# Serve reads straight from the stored documents, skipping model validation
+trusted_reads = False
+
+# Largest batch accepted by the bulk endpoints
+MAX_BULK_ITEMS = 5000
+
+# Widest "near me" search radius
+MAX_NEAR_RADIUS_KM = 50
+
+# Most map markers returned for one viewport
+MAX_MAP_MARKERS = 1000
+
+# Most similar properties returned for one property
+MAX_SIMILAR = 50
 
-def init_property_service(database):
-    """Initialize the property service with database connection."""
-    global property_service
-    property_service = PropertyService(database)
+
+def init_property_service(database, trusted: bool = False, **options):
+    """
+    Initialize the property service with database connection.
+    Extra options (cache_size, cache_ttl, ...) are passed to PropertyService.
+    """
+    global property_service, trusted_reads
+    property_service = PropertyService(database, **options)
+    trusted_reads = trusted
 
 
-@router.get("/properties", response_model=List[Property])
+@router.get(
+    "/properties",
+    response_model=Union[List[Property], List[PropertySummary], PropertyPage, PropertySummaryPage]
+)
 async def get_properties(
     skip: int = Query(0, ge=0, description="Number of properties to skip"),
+    cursor: Optional[str] = Query(
+        None, description="Opaque next_cursor from a previous page; pass an empty value to start cursor pagination"),
     limit: int = Query(100, ge=1, le=1000,
                        description="Maximum number of properties to return"),
     city: Optional[str] = Query(None, description="Filter by city"),
@@ -29,10 +85,185 @@ async def get_properties(
     max_budget: Optional[int] = Query(
         None, ge=0, description="Maximum budget amount"),
     is_verified: Optional[bool] = Query(
-        None, description="Filter by verification status")
+        None, description="Filter by verification status"),
+    view: Literal["full", "summary"] = Query(
+        "full", description="full documents or lightweight listing summaries"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated sparse fieldset, e.g. name,budget.amount,location.city"),
+    count: Literal["exact", "approx", "none"] = Query(
+        "none", description="Include the total number of matching properties in a page object")
 ):
     """
     Get all properties with optional filtering and pagination.
+
+    Passing `cursor` switches to keyset pagination (newest first) and returns
+    a page object with `items` and `next_cursor` instead of a bare list.
+    `view=summary` and `fields` only fetch the requested fields from MongoDB.
+    `count=approx` or `count=exact` also returns a page object, with `total`
+    set; approximate totals may lag recent writes by a few seconds.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        if min_budget and max_budget and min_budget > max_budget:
+            raise HTTPException(
+                status_code=400, detail="min_budget cannot be greater than max_budget")
+        if fields is not None and view != "full":
+            raise HTTPException(
+                status_code=400, detail="fields cannot be combined with view=summary")
+
+        # Sparse fieldsets have no schema, so they are returned as raw documents
+        if fields is not None:
+            projection, model = sparse_projection(fields.split(",")), None
+        elif view == "summary":
+            projection, model = SUMMARY_PROJECTION, PropertySummary
+        else:
+            projection, model = None, Property
+
+        # Trusted reads encode the stored documents without validating them
+        raw = model is None or trusted_reads
+        filters = dict(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+            projection=projection,
+            model=None if raw else model,
+        )
+
+        if cursor is not None:
+            if skip:
+                raise HTTPException(
+                    status_code=400, detail="skip cannot be combined with cursor")
+            items, next_cursor = await property_service.get_properties_page(
+                cursor=cursor, limit=limit, **filters)
+        else:
+            items = await property_service.get_properties_by_filters(
+                skip=skip, limit=limit, **filters)
+            if count == "none":
+                if raw:
+                    return _raw_response(_with_defaults(items, model))
+                return items
+            next_cursor = None
+
+        page = {"items": items, "next_cursor": next_cursor}
+        if count != "none":
+            page["total"] = await property_service.count_properties(
+                city=city,
+                property_type=property_type,
+                min_budget=min_budget,
+                max_budget=max_budget,
+                is_verified=is_verified,
+                exact=count == "exact",
+            )
+        if raw:
+            return _raw_response({**page, "items": _with_defaults(items, model)})
+        page_model = PropertySummaryPage if model is PropertySummary else PropertyPage
+        return page_model(**page)
+    except (InvalidCursorError, UnknownFieldError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+def _with_defaults(documents, model):
+    if model is None:
+        return [strip_internal(doc) for doc in documents]
+    return [apply_defaults(doc, model) for doc in documents]
+
+
+def _raw_response(content) -> Response:
+    """Encode raw MongoDB documents, bypassing response_model validation."""
+    return Response(content=dumps(content), media_type="application/json")
+
+
+@router.get("/properties/export")
+async def export_properties(
+    city: Optional[str] = Query(None, description="Filter by city"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status"),
+    updated_since: Optional[datetime] = Query(
+        None, description="Only properties updated at or after this time")
+):
+    """
+    Stream every matching property as newline-delimited JSON, in _id order,
+    or in (updated_at, _id) order with an updated_since watermark.
+    If the export fails part way, an {"error": ...} line is written and the
+    connection is closed without completing the response.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+    if min_budget and max_budget and min_budget > max_budget:
+        raise HTTPException(
+            status_code=400, detail="min_budget cannot be greater than max_budget")
+
+    documents = property_service.iter_properties(
+        city=city,
+        property_type=property_type,
+        min_budget=min_budget,
+        max_budget=max_budget,
+        is_verified=is_verified,
+        updated_since=updated_since,
+    )
+    # Run the query and read the first batch before the 200 headers are sent
+    try:
+        first = await anext(documents, None)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+    return StreamingResponse(_ndjson(first, documents), media_type="application/x-ndjson")
+
+
+async def _ndjson(first, documents):
+    if first is None:
+        return
+    # Flush once per driver batch rather than once per line
+    lines = [dumps(apply_defaults(first))]
+    try:
+        async for doc in documents:
+            lines.append(dumps(apply_defaults(doc)))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+    except Exception as e:
+        logger.exception("Property export failed part way")
+        lines.append(dumps({"error": f"Database error: {str(e)}"}))
+        yield b"\n".join(lines) + b"\n"
+        # Re-raising aborts the connection, so the export is not mistaken
+        # for a complete one
+        raise
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+@router.get("/properties/facets", response_model=PropertyFacets)
+async def get_property_facets(
+    city: Optional[str] = Query(None, description="Filter by city"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status")
+):
+    """
+    Count matching properties per city, property type, furnishing, bedroom
+    count and budget band, using the same filters as GET /properties.
     """
     if not property_service:
         raise HTTPException(
@@ -43,16 +274,246 @@ async def get_properties(
             raise HTTPException(
                 status_code=400, detail="min_budget cannot be greater than max_budget")
 
-        properties = await property_service.get_properties_by_filters(
+        return await property_service.get_property_facets(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/suggest", response_model=List[Suggestion])
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum number of suggestions")
+):
+    """
+    Suggest cities, areas and property names for a partially typed query.
+    Served from memory; tolerates typos and ranks popular terms higher.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+    return _raw_response(property_service.suggestions.suggest(q, limit))
+
+
+@router.get("/properties/search", response_model=List[SearchResult])
+async def search_properties(
+    q: str = Query(..., min_length=1, max_length=200,
+                   description='Search text; supports "quoted phrases" and -excluded words'),
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(20, ge=1, le=100,
+                       description="Maximum number of results to return"),
+    city: Optional[str] = Query(None, description="Filter by city"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status")
+):
+    """
+    Search property names, titles, keywords, areas, tags and descriptions.
+    Returns summaries sorted by relevance, each with its `score`.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        if min_budget and max_budget and min_budget > max_budget:
+            raise HTTPException(
+                status_code=400, detail="min_budget cannot be greater than max_budget")
+
+        documents = await property_service.search_properties(
+            text=q,
             city=city,
             property_type=property_type,
             min_budget=min_budget,
             max_budget=max_budget,
             is_verified=is_verified,
             skip=skip,
-            limit=limit
+            limit=limit,
+            projection=SUMMARY_PROJECTION,
         )
-        return properties
+        if trusted_reads:
+            return _raw_response(_with_defaults(documents, SearchResult))
+        return [SearchResult(**doc) for doc in documents]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/properties/near", response_model=List[NearbyProperty])
+async def get_properties_near(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the search point"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitude of the search point"),
+    radius_km: float = Query(5, gt=0, le=MAX_NEAR_RADIUS_KM,
+                             description="Search radius in kilometres"),
+    limit: int = Query(50, ge=1, le=500,
+                       description="Maximum number of properties to return"),
+    city: Optional[str] = Query(None, description="Filter by city"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status")
+):
+    """
+    Get property summaries within `radius_km` of a point, nearest first.
+    Each result carries its `distance_km` from the point.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        if min_budget and max_budget and min_budget > max_budget:
+            raise HTTPException(
+                status_code=400, detail="min_budget cannot be greater than max_budget")
+
+        documents = await property_service.get_properties_near(
+            latitude=lat,
+            longitude=lng,
+            radius_km=radius_km,
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+            limit=limit,
+            projection=SUMMARY_STAGE,
+        )
+        if trusted_reads:
+            return _raw_response(_with_defaults(documents, NearbyProperty))
+        return [NearbyProperty(**doc) for doc in documents]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+def _parse_point(value: str, name: str) -> Tuple[float, float]:
+    """Parse a "lat,lng" query value."""
+    try:
+        lat, lng = (float(part) for part in value.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be formatted as lat,lng")
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise HTTPException(status_code=400, detail=f"{name} is out of range")
+    return lat, lng
+
+
+@router.get("/properties/in-bounds", response_model=MapMarkers)
+async def get_properties_in_bounds(
+    sw: str = Query(..., description="South-west corner of the viewport as lat,lng"),
+    ne: str = Query(..., description="North-east corner of the viewport as lat,lng"),
+    limit: int = Query(500, ge=1, le=MAX_MAP_MARKERS,
+                       description="Maximum number of markers to return"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status")
+):
+    """
+    Get map markers (id, type, price and coordinates) for properties inside a viewport.
+    `truncated` is true when more properties matched than `limit`.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        south, west = _parse_point(sw, "sw")
+        north, east = _parse_point(ne, "ne")
+        try:
+            check_box(south, west, north, east)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid viewport: {e}")
+        if min_budget and max_budget and min_budget > max_budget:
+            raise HTTPException(
+                status_code=400, detail="min_budget cannot be greater than max_budget")
+
+        markers, truncated = await property_service.get_properties_in_bounds(
+            south=south,
+            west=west,
+            north=north,
+            east=east,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+            limit=limit,
+        )
+        # Markers are flat projections of indexed fields; skip validation
+        return _raw_response({"items": markers, "truncated": truncated})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/properties/clusters", response_model=List[MarkerCluster])
+async def get_property_clusters(
+    z: int = Query(..., ge=2, le=20, description="Map zoom level of the tile"),
+    x: int = Query(..., ge=0, description="Tile column"),
+    y: int = Query(..., ge=0, description="Tile row"),
+    property_type: Optional[str] = Query(
+        None, description="Filter by property type"),
+    min_budget: Optional[int] = Query(
+        None, ge=0, description="Minimum budget amount"),
+    max_budget: Optional[int] = Query(
+        None, ge=0, description="Maximum budget amount"),
+    is_verified: Optional[bool] = Query(
+        None, description="Filter by verification status")
+):
+    """
+    Get marker clusters for one Web Mercator (z/x/y) map tile.
+    Properties are grouped by geohash prefix, finer at higher zoom levels.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        if x >= 2 ** z or y >= 2 ** z:
+            raise HTTPException(
+                status_code=400, detail="Tile is outside the map at this zoom level")
+        if min_budget and max_budget and min_budget > max_budget:
+            raise HTTPException(
+                status_code=400, detail="min_budget cannot be greater than max_budget")
+
+        clusters = await property_service.get_property_clusters(
+            zoom=z,
+            x=x,
+            y=y,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        return _raw_response(clusters)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Database error: {str(e)}")
@@ -68,9 +529,12 @@ async def get_property_by_id(property_id: str):
             status_code=500, detail="Property service not initialized")
 
     try:
-        property_data = await property_service.get_property_by_id(property_id)
+        model = None if trusted_reads else Property
+        property_data = await property_service.get_property_by_id(property_id, model=model)
         if not property_data:
             raise HTTPException(status_code=404, detail="Property not found")
+        if trusted_reads:
+            return _raw_response(apply_defaults(property_data))
         return property_data
     except HTTPException:
         raise
@@ -96,6 +560,53 @@ async def create_property(property_data: PropertyCreate):
             status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.post("/properties:bulk", response_model=BulkResult)
+async def create_properties(
+    items: List[Dict[str, Any]] = Body(..., description="PropertyCreate objects")
+):
+    """
+    Create many properties at once.
+    Each item is validated on its own; the response reports success or the
+    error for every item, in request order.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+    try:
+        return await property_service.create_properties(items)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.patch("/properties:bulk", response_model=BulkResult)
+async def update_properties(
+    items: List[Dict[str, Any]] = Body(..., description="Objects of the form {id, update: PropertyUpdate}"),
+    ordered: bool = Query(
+        False, description="Stop at the first failed write instead of applying the rest")
+):
+    """
+    Partially update many properties with a single bulk write.
+    The response reports success or the error for every item, in request order.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+    try:
+        return await property_service.update_properties(items, ordered=ordered)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.put("/properties/{property_id}", response_model=Property)
 async def update_property(property_id: str, property_data: PropertyUpdate):
     """
@@ -158,6 +669,107 @@ async def partial_update_property(property_id: str, property_data: PropertyUpdat
             status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.get("/properties/{property_id}/similar", response_model=List[SimilarProperty])
+async def get_similar_properties(
+    property_id: str,
+    k: int = Query(10, ge=1, le=MAX_SIMILAR,
+                   description="Number of similar properties to return")
+):
+    """
+    Get the `k` properties most similar to a property, most similar first.
+    Answered from an in-memory approximate index that follows writes, so
+    results may differ slightly from the stored `similar_properties`.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+    if property_service.similar_index is None:
+        raise HTTPException(
+            status_code=503, detail="Similarity index is still being built")
+
+    try:
+        similar = await property_service.get_similar_properties(property_id, k=k)
+        if similar is None:
+            raise HTTPException(status_code=404, detail="Property not found")
+        return similar
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/properties/{property_id}/comments", response_model=CommentPage)
+async def get_comments(
+    property_id: str,
+    cursor: Optional[str] = Query(
+        None, description="Opaque next_cursor from a previous page"),
+    limit: int = Query(20, ge=1, le=100,
+                       description="Maximum number of comments to return")
+):
+    """
+    Get a property's comments, newest first.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        items, next_cursor = await property_service.get_comments(
+            property_id, cursor=cursor, limit=limit)
+        return CommentPage(items=items, next_cursor=next_cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/properties/{property_id}/comments", response_model=PropertyComment, status_code=201)
+async def add_comment(property_id: str, comment: CommentCreate):
+    """
+    Post a comment on a property.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        created_comment = await property_service.add_comment(property_id, comment)
+        if not created_comment:
+            raise HTTPException(status_code=404, detail="Property not found")
+        return created_comment
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
+# Declared after the comment routes, which share its path shape
+@router.post("/properties/{property_id}/{action}", status_code=204)
+async def record_engagement(property_id: str, action: Literal["view", "like", "inquiry"]):
+    """
+    Atomically increment the views, likes or inquiries counter of a property.
+    """
+    if not property_service:
+        raise HTTPException(
+            status_code=500, detail="Property service not initialized")
+
+    try:
+        # Views are coalesced by the write-behind buffer
+        incremented = await property_service.increment_counter(
+            property_id, action, buffered=action == "view")
+        if not incremented:
+            raise HTTPException(status_code=404, detail="Property not found")
+        return Response(status_code=204)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.delete("/properties/{property_id}", status_code=204)
 async def delete_property(property_id: str):
     """
@@ -7,7 +7,20 @@ Index Strategy:
 - budget.amount (ascending)
 - isVerified (descending)
 - created_at (descending)
+- updated_at (ascending), for incremental exports
 - Compound: (location.city, property_type, budget.amount)
+- Compound: (created_at, _id) descending, for cursor pagination
+- Compound: (location.city, created_at, _id), for cursor pagination by city
+- Compound: (location.geo 2dsphere, property_type, budget.amount), for "near me" search, map viewports and clusters
+- Text: name (10), meta.title (8), meta.keywords (6), location.area (6),
+  ai_metadata.tags (4), meta.description (1), for relevance search
+
+MongoDB Collection: property_comments
+
+Full comment history; the property document embeds only the newest few.
+
+Index Strategy:
+- Compound: (property_id, posted_at desc, _id desc)
 """
 
 from typing import List, Optional, Dict
@@ -35,7 +48,14 @@ property_document = {
         "coordinates": {
             "latitude": 17.4326,
             "longitude": 78.4071
-        }
+        },
+        # GeoJSON [longitude, latitude], derived from coordinates on write
+        "geo": {
+            "type": "Point",
+            "coordinates": [78.4071, 17.4326]
+        },
+        # Geohash of coordinates; prefixes group map clusters
+        "geohash": "tepg0jw23"
     },
 
     # Nearby Landmarks
@@ -0,0 +1,100 @@
+"""
+Recall and latency of the approximate similar-properties index against exact search.
+
+Builds a synthetic catalog, indexes it with SimilarityIndex and compares
+its answers with exact top-k search over the same (city, property type)
+group. Run from apps/api:
+
+    poetry run python -m benchmarks.similar_recall [--listings 50000] [--k 10]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from mongodb_serve.properties.ann import build_similarity_index, listing_group
+from mongodb_serve.properties.similar import raw_features
+
+CITIES = {
+    "Hyderabad": (17.385, 78.4867),
+    "Bangalore": (12.9716, 77.5946),
+    "Pune": (18.5204, 73.8567),
+    "Chennai": (13.0827, 80.2707),
+}
+PROPERTY_TYPES = ["House", "Apartment", "Plot"]
+
+
+def _listing(i: int, rng: random.Random) -> dict:
+    city = rng.choice(list(CITIES))
+    latitude, longitude = CITIES[city]
+    area = rng.randint(400, 5000)
+    price_per_sqft = int(rng.lognormvariate(8.8, 0.4))
+    return {
+        "_id": f"p{i:07d}",
+        "name": f"Listing {i}",
+        "property_type": rng.choice(PROPERTY_TYPES),
+        "location": {"city": city, "coordinates": {
+            "latitude": latitude + rng.gauss(0, 0.08),
+            "longitude": longitude + rng.gauss(0, 0.08),
+        }},
+        "budget": {"amount": area * price_per_sqft, "price_per_sqft": price_per_sqft},
+        "specifications": {
+            "built_up_area": area,
+            "bedrooms": max(1, area // 700),
+            "bathrooms": rng.choice([None, max(1, area // 900)]),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--listings", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    documents = [_listing(i, rng) for i in range(args.listings)]
+
+    started = time.perf_counter()
+    index = build_similarity_index(documents)
+    print(f"build: {time.perf_counter() - started:.2f}s for {len(index)} listings, {index.stats()}")
+
+    vectors = index.scaler.transform(raw_features(documents))
+    groups = {}
+    for row, doc in enumerate(documents):
+        groups.setdefault(listing_group(doc), []).append(row)
+    groups = {group: np.array(rows) for group, rows in groups.items()}
+
+    recalls, approximate, exact = [], [], []
+    for row in rng.sample(range(len(documents)), args.queries):
+        doc = documents[row]
+
+        started = time.perf_counter()
+        found = {similar["property_id"] for similar in index.similar(doc["_id"], args.k)}
+        approximate.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        rows = groups[listing_group(doc)]
+        distances = np.linalg.norm(vectors[rows] - vectors[row], axis=1)
+        distances[rows == row] = np.inf
+        nearest = rows[np.argpartition(distances, args.k - 1)[:args.k]]
+        exact.append(time.perf_counter() - started)
+
+        recalls.append(len(found & {documents[i]["_id"] for i in nearest.tolist()}) / args.k)
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.add(_listing(args.listings + i, rng))
+    insert_ms = (time.perf_counter() - started)
+
+    print(f"recall@{args.k}: {np.mean(recalls):.3f}")
+    print(f"approximate: {np.mean(approximate) * 1e3:.3f} ms/query (p99 {np.percentile(approximate, 99) * 1e3:.3f})")
+    print(f"      exact: {np.mean(exact) * 1e3:.3f} ms/query")
+    print(f"     insert: {insert_ms:.3f} ms/listing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Latency of autocomplete lookups and writes against the in-process SuggestIndex.
+
+Builds a synthetic catalog of city, area and listing name terms, then times
+cold lookups (memo cleared before each query) for prefixes and for typos,
+memoized lookups, and per-document and batched writes. Run from apps/api:
+
+    poetry run python -m benchmarks.suggest_latency [--terms 100000]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from mongodb_serve.properties.suggest import SuggestIndex, document_deltas
+
+CONSONANTS = "bcdfghjklmnprstvy"
+VOWELS = "aeiou"
+SUFFIXES = ["Residency", "Villa", "Heights", "Enclave", "Towers", "Homes", "Nagar", "Colony"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4))).title()
+
+
+def _document(rng: random.Random) -> dict:
+    return {
+        "name": f"{_word(rng)} {_word(rng)} {rng.choice(SUFFIXES)}",
+        "location": {"city": _word(rng), "area": f"{_word(rng)} {rng.choice(SUFFIXES)}"},
+    }
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    """Swap two neighbouring letters after the first."""
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def _report(name: str, latencies: list) -> None:
+    print(f"{name:>12}: p50 {np.percentile(latencies, 50) * 1e3:.3f} ms, "
+          f"p99 {np.percentile(latencies, 99) * 1e3:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--writes", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    terms = set()
+    while len(terms) < args.terms:
+        document = _document(rng)
+        terms.update([("name", document["name"]), ("area", document["location"]["area"])])
+    index = SuggestIndex()
+    started = time.perf_counter()
+    index.replace((term, rng.randint(1, 50)) for term in terms)
+    print(f"build: {time.perf_counter() - started:.2f}s for {len(index)} terms")
+
+    texts = [text for _, text in rng.sample(sorted(terms), args.queries)]
+    queries = {
+        "prefix": [text[:rng.randint(3, 8)] for text in texts],
+        "typo": [_typo(text[:rng.randint(6, 12)], rng) for text in texts],
+    }
+    for name, batch in queries.items():
+        latencies = []
+        for query in batch:
+            index._memo.clear()
+            started = time.perf_counter()
+            index.suggest(query)
+            latencies.append(time.perf_counter() - started)
+        _report(f"cold {name}", latencies)
+
+    for query in queries["typo"]:
+        index.suggest(query)
+    latencies = []
+    for query in queries["typo"]:
+        started = time.perf_counter()
+        index.suggest(query)
+        latencies.append(time.perf_counter() - started)
+    _report("memoized", latencies)
+
+    documents = [_document(rng) for _ in range(args.writes)]
+    started = time.perf_counter()
+    for document in documents[:args.writes // 2]:
+        index.add_document(document)
+    single = (time.perf_counter() - started) / (args.writes // 2)
+    started = time.perf_counter()
+    index.apply(document_deltas(documents[args.writes // 2:]))
+    batched = (time.perf_counter() - started) / (args.writes - args.writes // 2)
+    print(f"add_document: {single * 1e3:.3f} ms/document")
+    print(f" apply batch: {batched * 1e3:.3f} ms/document")
+
+
+if __name__ == "__main__":
+    main()
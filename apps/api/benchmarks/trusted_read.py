@@ -0,0 +1,50 @@
+"""
+Per-document cost of the validated and trusted property read paths.
+
+Run from apps/api:
+
+    poetry run python -m benchmarks.trusted_read
+"""
+
+import timeit
+from typing import List
+
+import bson
+from pydantic import TypeAdapter
+
+from api.schemas.property import property_document
+from mongodb_serve.properties.models import Property
+from mongodb_serve.properties.serialization import apply_defaults, dumps
+
+PAGE_SIZE = 100
+REPEAT = 5
+
+
+def _stored_document() -> dict:
+    """The sample document as Motor would return it after a validated write."""
+    doc = Property(**property_document).model_dump(by_alias=True, exclude_unset=True)
+    doc["_id"] = bson.ObjectId()
+    return bson.decode(bson.encode(doc))
+
+
+def main():
+    page = [_stored_document() for _ in range(PAGE_SIZE)]
+    response_adapter = TypeAdapter(List[Property])
+
+    def validated():
+        # PropertyService builds models, FastAPI validates and serializes them
+        models = [Property(**{**doc, "_id": str(doc["_id"])}) for doc in page]
+        response_adapter.dump_json(response_adapter.validate_python(models), by_alias=True)
+
+    def trusted():
+        dumps([apply_defaults(doc) for doc in page])
+
+    for name, fn in (("validated", validated), ("trusted", trusted)):
+        number = 20
+        best = min(timeit.repeat(fn, number=number, repeat=REPEAT))
+        per_doc_us = best / number / PAGE_SIZE * 1e6
+        print(f"{name:>10}: {per_doc_us:8.1f} us/document")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,52 @@
+import asyncio
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
 
+from .metrics import CommandMetrics
+from .pool import PoolMetrics
+
 
 _client: Optional[AsyncIOMotorClient] = None
 
+# Connection pool gauges and command histograms of the singleton client
+pool_metrics = PoolMetrics()
+command_metrics = CommandMetrics()
+
+
+# Client option set by each environment variable, and its type
+POOL_ENV_OPTIONS = {
+    "MONGODB_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGODB_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGODB_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGODB_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGODB_COMPRESSORS": ("compressors", str),
+    "MONGODB_ZLIB_COMPRESSION_LEVEL": ("zlibCompressionLevel", int),
+}
+
+
+def pool_options() -> Dict[str, Any]:
+    """
+    Connection pool and wire compression options set in the environment:
+    MONGODB_MAX_POOL_SIZE, MONGODB_MIN_POOL_SIZE, MONGODB_MAX_IDLE_TIME_MS,
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS, MONGODB_COMPRESSORS (comma-separated) and
+    MONGODB_ZLIB_COMPRESSION_LEVEL.
+    Client keyword arguments override the connection string, so only the
+    variables that are set (and non-empty) are passed; everything else is left
+    to the MONGODB_URI options and the driver defaults. A wait queue timeout
+    of 0 means waiting indefinitely, which is the driver default.
+    """
+    options = {}
+    for variable, (option, parse) in POOL_ENV_OPTIONS.items():
+        value = os.getenv(variable, "").strip()
+        if value:
+            options[option] = parse(value)
+    if options.get("waitQueueTimeoutMS") == 0:
+        del options["waitQueueTimeoutMS"]
+    # zstd and snappy need the zstandard / python-snappy packages
+    return options
+
 
 def get_client() -> AsyncIOMotorClient:
     """
@@ -24,6 +65,8 @@ def get_client() -> AsyncIOMotorClient:
             serverSelectionTimeoutMS=5000,
             connectTimeoutMS=20000,
             socketTimeoutMS=20000,
+            event_listeners=[pool_metrics, command_metrics],
+            **pool_options(),
         )
 
     return _client
@@ -46,3 +89,18 @@ async def ping() -> bool:
         return True
     except ConnectionFailure:
         return False
+
+
+async def warm_pool() -> int:
+    """
+    Open minPoolSize connections up front, so the first requests after a
+    start do not pay for connection handshakes. The driver only tops the
+    pool up to minPoolSize in the background, seconds later.
+    Returns the number of open connections.
+    """
+    client = get_client()
+    # Concurrent pings each need their own connection
+    await asyncio.gather(*(
+        client.admin.command("ping") for _ in range(client.options.pool_options.min_pool_size)
+    ))
+    return pool_metrics.open
@@ -0,0 +1,115 @@
+"""
+Prometheus metrics for MongoDB commands and the connection pool.
+
+CommandMetrics is registered on the client as a pymongo CommandListener and
+records, per command name:
+
+- mongodb_command_duration_seconds: round trip as measured by the driver;
+- mongodb_command_reply_documents: documents in cursor batches;
+- mongodb_command_reply_bytes: BSON size of the reply, for a sample of
+  replies only, since the driver hands listeners decoded documents and
+  re-encoding a page of listings costs milliseconds;
+- mongodb_command_failures_total.
+
+PoolCollector exports the PoolMetrics gauges at scrape time. Metrics are
+registered in prometheus_client's default registry, which the API serves at
+/metrics.
+"""
+
+import random
+from typing import Iterator
+
+import bson
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from pymongo import monitoring
+
+from .pool import PoolMetrics
+
+# Commands labelled by name; anything else is counted as "other" to bound label cardinality
+COMMANDS = frozenset({
+    "find", "getMore", "insert", "update", "delete", "findAndModify", "aggregate",
+    "count", "distinct", "bulkWrite", "createIndexes", "listIndexes", "ping",
+})
+
+# Share of replies whose size is measured
+REPLY_SAMPLE_RATE = 0.05
+
+COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trip time", ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "MongoDB commands that failed", ["command"],
+)
+REPLY_DOCUMENTS = Histogram(
+    "mongodb_command_reply_documents", "Documents returned per cursor batch", ["command"],
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+REPLY_BYTES = Histogram(
+    "mongodb_command_reply_bytes", "BSON size of sampled MongoDB replies", ["command"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+
+def command_label(command_name: str) -> str:
+    return command_name if command_name in COMMANDS else "other"
+
+
+def batch_size(reply: dict) -> int:
+    """Documents in a find/aggregate/getMore reply, 0 for other replies."""
+    cursor = reply.get("cursor")
+    if not isinstance(cursor, dict):
+        return 0
+    batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+    return len(batch) if batch is not None else 0
+
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self, reply_sample_rate: float = REPLY_SAMPLE_RATE):
+        self.reply_sample_rate = reply_sample_rate
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        command = command_label(event.command_name)
+        COMMAND_DURATION.labels(command).observe(event.duration_micros / 1e6)
+        reply = event.reply
+        REPLY_DOCUMENTS.labels(command).observe(batch_size(reply))
+        # Sensitive commands (auth, hello) have their replies redacted to {}
+        if reply and random.random() < self.reply_sample_rate:
+            REPLY_BYTES.labels(command).observe(len(bson.encode(reply)))
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        command = command_label(event.command_name)
+        COMMAND_DURATION.labels(command).observe(event.duration_micros / 1e6)
+        COMMAND_FAILURES.labels(command).inc()
+
+
+class PoolCollector(Collector):
+    """Reads connection pool gauges from PoolMetrics when scraped."""
+
+    def __init__(self, pool_metrics: PoolMetrics):
+        self.pool_metrics = pool_metrics
+
+    def collect(self) -> Iterator[Metric]:
+        stats = self.pool_metrics.stats()
+        open_connections = GaugeMetricFamily(
+            "mongodb_pool_connections_open", "Open pooled connections", labels=["server"])
+        in_use = GaugeMetricFamily(
+            "mongodb_pool_connections_in_use", "Pooled connections checked out", labels=["server"])
+        for server, gauges in stats["servers"].items():
+            open_connections.add_metric([server], gauges["open"])
+            in_use.add_metric([server], gauges["in_use"])
+        checkouts = CounterMetricFamily("mongodb_pool_checkouts", "Connection checkouts")
+        checkouts.add_metric([], stats["checkouts"])
+        wait = CounterMetricFamily(
+            "mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection")
+        wait.add_metric([], self.pool_metrics.wait_seconds_total)
+        failures = CounterMetricFamily(
+            "mongodb_pool_checkout_failures", "Failed connection checkouts", labels=["reason"])
+        for reason, count in stats["checkout_failures"].items():
+            failures.add_metric([reason], count)
+        yield from (open_connections, in_use, checkouts, wait, failures)
@@ -0,0 +1,127 @@
+"""
+Connection pool gauges collected from pymongo's pool events.
+
+Sizing maxPoolSize against request concurrency needs to know how many
+connections requests actually hold and how long they wait for one.
+PoolMetrics is registered on the client as a ConnectionPoolListener and
+keeps, per server and in total:
+
+- connections open and checked out (in use);
+- checkout wait times: count, total, max and percentiles over recent checkouts;
+- failed checkouts by reason and pool clears.
+
+Listeners are called synchronously on the driver's threads, so updates take
+a lock and only do constant work.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+# Checkout waits kept for percentiles
+_RECENT_WAITS = 1024
+
+
+def _percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self, recent: int = _RECENT_WAITS):
+        self._lock = threading.Lock()
+        # Checkout start per driver thread; started and checked-out events
+        # of one checkout are published on the same thread
+        self._local = threading.local()
+        self._open: Counter = Counter()
+        self._in_use: Counter = Counter()
+        self._recent_waits = deque(maxlen=recent)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.checkout_failures: Counter = Counter()
+        self.pool_clears = 0
+
+    @property
+    def open(self) -> int:
+        with self._lock:
+            return sum(self._open.values())
+
+    @property
+    def in_use(self) -> int:
+        with self._lock:
+            return sum(self._in_use.values())
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        with self._lock:
+            self._open.pop(event.address, None)
+            self._in_use.pop(event.address, None)
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._open[event.address] += 1
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            if self._open[event.address] > 0:
+                self._open[event.address] -= 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        self._local.started = None
+        with self._lock:
+            self.checkout_failures[event.reason] += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        started = getattr(self._local, "started", None)
+        wait = time.perf_counter() - started if started is not None else 0.0
+        self._local.started = None
+        with self._lock:
+            self._in_use[event.address] += 1
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self._recent_waits.append(wait)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            if self._in_use[event.address] > 0:
+                self._in_use[event.address] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            servers = {
+                f"{host}:{port}": {"open": self._open[(host, port)], "in_use": self._in_use[(host, port)]}
+                for host, port in self._open.keys() | self._in_use.keys()
+            }
+            stats = {
+                "open": sum(self._open.values()),
+                "in_use": sum(self._in_use.values()),
+                "servers": servers,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "pool_clears": self.pool_clears,
+                "wait_ms_mean": round(1000 * self.wait_seconds_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(1000 * self.wait_seconds_max, 3),
+            }
+        for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            stats[f"wait_ms_{name}"] = round(1000 * _percentile(waits, fraction), 3) if waits else 0.0
+        return stats
@@ -0,0 +1,192 @@
+"""
+Incremental approximate nearest-neighbour index over listing features.
+
+The similar-properties batch job (similar.py) recomputes the whole catalog,
+which is far too much work for a single insert. SimilarityIndex keeps every
+listing's feature vector in memory and hashes it with Euclidean LSH
+(p-stable random projections) into several tables. A query only re-ranks the
+listings sharing a bucket with it, so listings can be added, moved or
+removed one at a time and similar listings are found in milliseconds.
+
+Buckets are partitioned by (city, property type), matching the batch job.
+Features are scaled with the FeatureScaler fitted when the index was built,
+so the index is rebuilt periodically as prices drift.
+"""
+
+from itertools import product
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .similar import FeatureScaler, field_value, raw_features, similarity_score
+
+# LSH parameters: more tables raise recall, more hashes per table shrink
+# buckets, wider buckets do both at the cost of re-ranking more listings
+TABLES = 10
+HASHES = 6
+BUCKET_WIDTH = 4.0
+
+# Probe neighbouring buckets when exact buckets hold fewer candidates than this many per result
+_PROBE_FACTOR = 4
+
+Group = Tuple[Any, Any]  # (city, property type)
+
+
+def listing_group(document: Dict[str, Any]) -> Group:
+    return field_value(document, "location.city"), document.get("property_type")
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        scaler: FeatureScaler,
+        tables: int = TABLES,
+        hashes: int = HASHES,
+        bucket_width: float = BUCKET_WIDTH,
+        seed: int = 0
+    ):
+        self.scaler = scaler
+        self.bucket_width = bucket_width
+        dimensions = len(scaler.scale)
+        rng = np.random.default_rng(seed)
+        self._projections = rng.normal(size=(tables * hashes, dimensions)).astype(np.float32)
+        self._offsets = rng.uniform(0, bucket_width, size=tables * hashes).astype(np.float32)
+        self._tables = tables
+        self._hashes = hashes
+
+        self._vectors = np.zeros((1024, dimensions), dtype=np.float32)
+        self._rows: Dict[Any, int] = {}
+        self._free: List[int] = []
+        self._next_row = 0
+        # Per row: id, group, name, budget and bucket keys
+        self._ids: Dict[int, Any] = {}
+        self._info: Dict[int, Tuple[Group, str, int]] = {}
+        self._keys: Dict[int, List[Tuple]] = {}
+        self._buckets: List[Dict[Tuple, Set[int]]] = [{} for _ in range(tables)]
+        self._groups: Dict[Group, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, property_id: Any) -> bool:
+        return property_id in self._rows
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket coordinates, shaped (rows, tables, hashes)."""
+        codes = np.floor((vectors @ self._projections.T + self._offsets) / self.bucket_width)
+        return codes.astype(np.int64).reshape(len(vectors), self._tables, self._hashes)
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._next_row == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+        self._next_row += 1
+        return self._next_row - 1
+
+    def add_many(self, documents: List[Dict[str, Any]], raw: Optional[np.ndarray] = None) -> None:
+        """Index (or re-index) listings; ``raw`` are their precomputed raw_features."""
+        if not documents:
+            return
+        vectors = self.scaler.transform(raw_features(documents) if raw is None else raw)
+        codes = self._codes(vectors).tolist()
+        for doc, vector, doc_codes in zip(documents, vectors, codes):
+            self.remove(doc["_id"])
+            row = self._allocate()
+            group = listing_group(doc)
+            self._vectors[row] = vector
+            self._rows[doc["_id"]] = row
+            self._ids[row] = doc["_id"]
+            self._info[row] = (group, doc.get("name", ""), field_value(doc, "budget.amount") or 0)
+            keys = [(group, *table_codes) for table_codes in doc_codes]
+            self._keys[row] = keys
+            for table, key in zip(self._buckets, keys):
+                table.setdefault(key, set()).add(row)
+            self._groups.setdefault(group, set()).add(row)
+
+    def add(self, document: Dict[str, Any]) -> None:
+        self.add_many([document])
+
+    def remove(self, property_id: Any) -> bool:
+        row = self._rows.pop(property_id, None)
+        if row is None:
+            return False
+        group = self._info.pop(row)[0]
+        for table, key in zip(self._buckets, self._keys.pop(row)):
+            bucket = table[key]
+            bucket.discard(row)
+            if not bucket:
+                del table[key]
+        self._groups[group].discard(row)
+        if not self._groups[group]:
+            del self._groups[group]
+        del self._ids[row]
+        self._free.append(row)
+        return True
+
+    def _candidates(self, row: int, k: int) -> Set[int]:
+        keys = self._keys[row]
+        candidates = set()
+        for table, key in zip(self._buckets, keys):
+            candidates |= table.get(key, set())
+        if len(candidates) < _PROBE_FACTOR * k + 1:
+            # Multi-probe: buckets one step away along each hash
+            for table, key in zip(self._buckets, keys):
+                group, codes = key[0], key[1:]
+                for position, step in product(range(len(codes)), (-1, 1)):
+                    probe = list(codes)
+                    probe[position] += step
+                    candidates |= table.get((group, *probe), set())
+        if len(candidates) < k + 1:
+            # Sparse group: search it exhaustively
+            candidates = set(self._groups[self._info[row][0]])
+        candidates.discard(row)
+        return candidates
+
+    def similar(self, property_id: Any, k: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        The ``k`` most similar indexed listings, most similar first, shaped like
+        SimilarProperty. Returns None when the listing is not indexed.
+        """
+        row = self._rows.get(property_id)
+        if row is None:
+            return None
+        candidates = np.fromiter(self._candidates(row, k), dtype=np.int64)
+        if not len(candidates):
+            return []
+        distances = np.linalg.norm(self._vectors[candidates] - self._vectors[row], axis=1)
+        if len(candidates) > k:
+            nearest = np.argpartition(distances, k - 1)[:k]
+        else:
+            nearest = np.arange(len(candidates))
+        nearest = nearest[np.argsort(distances[nearest])]
+        budget = self._info[row][2]
+        results = []
+        for i in nearest.tolist():
+            candidate = int(candidates[i])
+            _, name, candidate_budget = self._info[candidate]
+            results.append({
+                "property_id": self._ids[candidate],
+                "name": name,
+                "similarity_score": similarity_score(distances[i]),
+                "price_difference": int(candidate_budget - budget),
+            })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        buckets = sum(len(table) for table in self._buckets)
+        return {
+            "listings": len(self._rows),
+            "groups": len(self._groups),
+            "buckets": buckets,
+            "mean_bucket_size": round(len(self._rows) * self._tables / buckets, 2) if buckets else 0,
+        }
+
+
+def build_similarity_index(documents: List[Dict[str, Any]], **options: Any) -> SimilarityIndex:
+    """Fit the feature scaling on ``documents`` and index them all."""
+    raw = raw_features(documents or [{}])
+    index = SimilarityIndex(FeatureScaler(raw), **options)
+    if documents:
+        index.add_many(documents, raw)
+    return index
@@ -0,0 +1,97 @@
+"""
+In-process caches used by PropertyService.
+
+Each worker process has its own cache, so entries can be stale for up to
+``ttl`` seconds after a write made through another process.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries also expire after ``ttl`` seconds.
+    With ``weigh``, ``maxsize`` bounds the total weight (e.g. documents held)
+    instead of the number of entries.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 weigh: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._weigh = weigh
+        self._weight = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value, weight = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._weight -= weight
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        weight = self._weigh(value) if self._weigh else 1
+        if weight > self.maxsize:
+            return
+        self._discard(key)
+        self._entries[key] = (self._clock() + self.ttl, value, weight)
+        self._weight += weight
+        while self._weight > self.maxsize:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._weight -= evicted
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, _MISSING)
+        if entry is _MISSING:
+            return False
+        self._weight -= entry[2]
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        if self._discard(key):
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._weight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "weight": self._weight,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,166 @@
+"""
+Change-stream driven cache invalidation.
+
+Every API worker keeps its own PropertyService caches, so a write handled by
+one process leaves stale entries in the others until their TTL runs out.
+PropertyChangeWatcher tails the ``properties`` change stream and invalidates
+the local caches by ``_id``. Inserted and updated listings arrive with their
+current similarity fields (``fullDocument`` update lookup) and are re-indexed
+in the similar-listing index, so writes made by other workers become neighbour
+candidates without waiting for the next rebuild. The resume token is persisted so a restarted
+worker continues where it stopped instead of missing events.
+
+Change streams need a replica set; on a standalone server the watcher logs a
+warning and exits, leaving TTL expiry as the only invalidation.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import OperationFailure, PyMongoError
+
+from .counters import COUNTER_FIELDS
+from .service import PropertyService
+from .similar import SIMILARITY_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+# Server error codes
+_NOT_A_REPLICA_SET = 40573
+_CHANGE_STREAM_FATAL = 280
+_CHANGE_STREAM_HISTORY_LOST = 286
+
+# Events that end the stream: the collection is gone or renamed
+_STREAM_ENDING = ("invalidate", "drop", "rename", "dropDatabase")
+
+# Skip updates that only bump engagement counters (cached copies tolerate
+# stale counts), then keep the event type and _id needed to invalidate and
+# the fields the similar-listing index reads
+_PIPELINE = [
+    {"$match": {"$or": [
+        {"operationType": {"$ne": "update"}},
+        {"updateDescription.removedFields.0": {"$exists": True}},
+        {"$expr": {"$gt": [
+            {"$size": {"$setDifference": [
+                {"$map": {
+                    "input": {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}},
+                    "in": "$$this.k",
+                }},
+                list(COUNTER_FIELDS.values()),
+            ]}},
+            0,
+        ]}},
+    ]}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "fullDocument._id": 1,
+        **{"fullDocument." + path: 1 for path in SIMILARITY_PROJECTION},
+    }},
+]
+
+
+class PropertyChangeWatcher:
+    def __init__(
+        self,
+        service: PropertyService,
+        token_collection: AsyncIOMotorCollection,
+        name: str = "properties-cache",
+        save_every: int = 100,
+        retry_delay: float = 5.0
+    ):
+        self.service = service
+        self.token_collection = token_collection
+        self.name = name
+        self.save_every = save_every
+        self.retry_delay = retry_delay
+        self.resume_token: Optional[Dict[str, Any]] = None
+        self._unsaved = 0
+
+    async def load_token(self) -> Optional[Dict[str, Any]]:
+        doc = await self.token_collection.find_one({"_id": self.name})
+        return doc["token"] if doc else None
+
+    async def save_token(self) -> None:
+        if self.resume_token is None or not self._unsaved:
+            return
+        await self.token_collection.update_one(
+            {"_id": self.name},
+            {"$set": {"token": self.resume_token, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        self._unsaved = 0
+
+    async def reset_token(self) -> None:
+        """Forget the resume token so the next stream starts from now."""
+        self.resume_token = None
+        self._unsaved = 0
+        await self.token_collection.delete_one({"_id": self.name})
+
+    def apply(self, change: Dict[str, Any]) -> bool:
+        """
+        Invalidate caches for one change event.
+        Returns False when the event ends the stream.
+        """
+        operation = change.get("operationType")
+        if operation in _STREAM_ENDING:
+            self.service.clear_caches()
+            return False
+        document_key = change.get("documentKey") or {}
+        if "_id" in document_key:
+            self.service.invalidate(document_key["_id"])
+            if operation == "delete":
+                self.service.unindex_similar(document_key["_id"])
+            elif change.get("fullDocument"):
+                # Absent when the listing was deleted before the update lookup
+                self.service.index_similar([change["fullDocument"]])
+        else:
+            self.service.clear_caches()
+        return True
+
+    async def _watch(self) -> None:
+        collection = self.service.collection
+        async with collection.watch(
+                _PIPELINE, resume_after=self.resume_token, full_document="updateLookup") as stream:
+            async for change in stream:
+                self.resume_token = stream.resume_token
+                self._unsaved += 1
+                if not self.apply(change):
+                    # The token of an ending event cannot be resumed after
+                    await self.reset_token()
+                    return
+                if self._unsaved >= self.save_every:
+                    await self.save_token()
+
+    async def run(self) -> None:
+        """Tail the change stream until cancelled."""
+        loaded = False
+        try:
+            while True:
+                try:
+                    if not loaded:
+                        self.resume_token = await self.load_token()
+                        loaded = True
+                    await self._watch()
+                except OperationFailure as e:
+                    if e.code == _NOT_A_REPLICA_SET:
+                        logger.warning("Change streams unavailable, cache invalidation is TTL only: %s", e)
+                        return
+                    if e.code in (_CHANGE_STREAM_FATAL, _CHANGE_STREAM_HISTORY_LOST):
+                        # Events since the token are gone; start fresh
+                        logger.warning("Cannot resume properties change stream: %s", e)
+                        await self.reset_token()
+                    self.service.clear_caches()
+                    await asyncio.sleep(self.retry_delay)
+                except PyMongoError as e:
+                    logger.warning("Properties change stream interrupted: %s", e)
+                    self.service.clear_caches()
+                    await asyncio.sleep(self.retry_delay)
+        finally:
+            try:
+                await self.save_token()
+            except PyMongoError as e:
+                logger.warning("Could not save change stream resume token: %s", e)
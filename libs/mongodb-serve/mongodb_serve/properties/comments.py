@@ -0,0 +1,84 @@
+"""
+Migration of embedded comments into the ``property_comments`` collection.
+
+Comments used to live only in ``Property.comments``, an unbounded list that
+grows every document read and edges popular listings toward the 16 MB BSON
+limit. This copies every embedded comment into ``property_comments`` and trims
+each property down to its most recent comments. It is idempotent, so it can be
+re-run after an interrupted migration:
+
+    python -m mongodb_serve.properties.comments --embedded 5
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from .service import EMBEDDED_COMMENTS, push_recent_comments
+
+
+async def migrate_embedded_comments(
+    database: AsyncIOMotorDatabase,
+    embedded_limit: int = EMBEDDED_COMMENTS,
+    batch_size: int = 100
+) -> Dict[str, int]:
+    """Copy embedded comments to property_comments and trim the embedded lists."""
+    stats = {"properties": 0, "comments": 0, "trimmed": 0}
+    cursor = database.properties.find(
+        {"comments.0": {"$exists": True}}, {"comments": 1}).batch_size(batch_size)
+
+    async for doc in cursor:
+        property_id = doc["_id"]
+        # Upsert on the comment's natural key so re-runs do not duplicate it
+        operations = [
+            UpdateOne(
+                {"property_id": property_id,
+                 "user_id": comment.get("user_id"),
+                 "posted_at": comment.get("posted_at")},
+                {"$setOnInsert": {**comment, "_id": str(ObjectId()), "property_id": property_id}},
+                upsert=True,
+            )
+            for comment in doc["comments"]
+        ]
+        result = await database.property_comments.bulk_write(operations, ordered=False)
+        stats["comments"] += result.upserted_count
+        stats["properties"] += 1
+
+        if len(doc["comments"]) > embedded_limit:
+            await database.properties.update_one(
+                {"_id": property_id}, push_recent_comments([], embedded_limit))
+            stats["trimmed"] += 1
+
+    return stats
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from ..client import get_database
+    from .indexes import ensure_comment_indexes
+
+    database = get_database()
+    await ensure_comment_indexes(database.property_comments)
+    stats = await migrate_embedded_comments(database, embedded_limit=args.embedded)
+    print(f"Properties: {stats['properties']}, comments copied: {stats['comments']}, "
+          f"trimmed: {stats['trimmed']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Move embedded property comments into property_comments.")
+    parser.add_argument("--embedded", type=int, default=EMBEDDED_COMMENTS,
+                        help="most recent comments to keep embedded")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+"""
+Engagement counters and their write-behind buffer.
+
+A viral listing can receive thousands of views a minute, all landing on one
+document. CounterBuffer coalesces the deltas per property in memory and
+flushes them periodically as a single unordered bulk_write, so the database
+sees at most one update per property per flush interval.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Engagement counters by action name
+COUNTER_FIELDS = {"view": "views", "like": "likes", "inquiry": "inquiries"}
+
+# Counter bumps are acknowledged by the primary only, without waiting for the journal
+COUNTER_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+
+class CounterBuffer:
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000
+    ):
+        self.collection = collection
+        # Longest time a delta waits in memory, excluding the flush itself
+        self.flush_interval = flush_interval
+        # Flush early once this many properties have pending deltas
+        self.max_pending = max_pending
+        self._pending: Dict[Any, Dict[str, int]] = {}
+        self._buffered = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.flushed_deltas = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add(self, property_id: Any, field: str, amount: int = 1) -> None:
+        """Buffer ``amount`` for ``field`` of a property."""
+        counters = self._pending.setdefault(property_id, {})
+        counters[field] = counters.get(field, 0) + amount
+        self._buffered += amount
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def _requeue(self, pending: Dict[Any, Dict[str, int]]) -> None:
+        for property_id, counters in pending.items():
+            for field, amount in counters.items():
+                self.add(property_id, field, amount)
+
+    async def flush(self) -> int:
+        """Write all buffered deltas; returns the number of properties updated."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        buffered, self._buffered = self._buffered, 0
+        ids = list(pending)
+        operations = [UpdateOne({"_id": property_id}, {"$inc": pending[property_id]})
+                      for property_id in ids]
+
+        collection = self.collection.with_options(write_concern=COUNTER_WRITE_CONCERN)
+        started = time.perf_counter()
+        try:
+            await collection.bulk_write(operations, ordered=False)
+            self.flushed_deltas += buffered
+        except BulkWriteError as e:
+            failed = {ids[error["index"]] for error in e.details["writeErrors"]}
+            logger.warning("Failed to flush counters for %d properties", len(failed))
+            self._requeue({property_id: pending[property_id] for property_id in failed})
+            self.flushed_deltas += buffered - sum(sum(pending[i].values()) for i in failed)
+            self.failed_flushes += 1
+        except PyMongoError as e:
+            # Retryable writes already retried once; keep the deltas for the next flush
+            logger.warning("Failed to flush counters: %s", e)
+            self._requeue(pending)
+            self.failed_flushes += 1
+        finally:
+            self.last_flush_seconds = time.perf_counter() - started
+            self.max_flush_seconds = max(self.max_flush_seconds, self.last_flush_seconds)
+            self.flushes += 1
+        return len(operations)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop."""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending_properties": len(self._pending),
+            "buffered_deltas": self._buffered,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "flushed_deltas": self.flushed_deltas,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+        }
@@ -0,0 +1,156 @@
+"""
+Geospatial fields derived from ``Location.coordinates``.
+
+Plain latitude/longitude fields cannot be indexed for proximity queries, so
+every write also stores ``location.geo``, a GeoJSON point covered by a
+2dsphere index, and ``location.geohash``, whose prefixes group listings into
+map clusters. Existing documents are backfilled with:
+
+    python -m mongodb_serve.properties.geo --backfill
+"""
+
+import argparse
+import asyncio
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+GEO_FIELD = "location.geo"
+GEOHASH_FIELD = "location.geohash"
+
+# Stored geohash length (~5 m cells); clusters group on shorter prefixes
+GEOHASH_PRECISION = 9
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Polygon edges take the shorter way around the globe, so a box this wide or
+# wider would select the longitudes outside it
+MAX_BOX_SPAN = 180.0
+
+
+def geo_point(coordinates: Dict[str, float]) -> Dict[str, Any]:
+    """GeoJSON point for a Coordinates dict (GeoJSON order is longitude, latitude)."""
+    return {"type": "Point", "coordinates": [coordinates["longitude"], coordinates["latitude"]]}
+
+
+def check_box(south: float, west: float, north: float, east: float) -> None:
+    """
+    Raise ValueError for viewports that cannot be queried as a polygon: empty
+    or inverted boxes, edges on a pole (a polygon edge along a pole collapses
+    to a point) and boxes spanning MAX_BOX_SPAN degrees of longitude or more.
+    """
+    if north <= south:
+        raise ValueError("Box north edge must be north of its south edge")
+    if east <= west:
+        raise ValueError("Box east edge must be east of its west edge")
+    if abs(south) >= 90 or abs(north) >= 90:
+        raise ValueError("Box edges must lie strictly between the poles")
+    if east - west >= MAX_BOX_SPAN:
+        raise ValueError(f"Box must span less than {MAX_BOX_SPAN:g} degrees of longitude")
+
+
+def box_polygon(south: float, west: float, north: float, east: float) -> Dict[str, Any]:
+    """
+    GeoJSON polygon for a viewport. Edges are geodesics, so on viewports
+    spanning many degrees the north and south edges bow slightly poleward.
+    Raises ValueError for boxes rejected by check_box.
+    """
+    check_box(south, west, north, east)
+    ring = [[west, south], [east, south], [east, north], [west, north], [west, south]]
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash of a point."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # bits alternate longitude, latitude
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cluster_precision(zoom: int) -> int:
+    """Geohash prefix length giving a few dozen clusters per 256 px map tile."""
+    return min(GEOHASH_PRECISION, max(1, round((zoom + 3) / 2.5)))
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a Web Mercator (slippy map) tile."""
+    n = 2 ** zoom
+
+    def latitude(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return latitude(y + 1), x / n * 360 - 180, latitude(y), (x + 1) / n * 360 - 180
+
+
+def with_geo(location: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a location dict with its derived geospatial fields set."""
+    location = dict(location)
+    coordinates = location["coordinates"]
+    location["geo"] = geo_point(coordinates)
+    location["geohash"] = geohash(coordinates["latitude"], coordinates["longitude"])
+    return location
+
+
+async def backfill_geo(collection: AsyncIOMotorCollection, batch_size: int = 500) -> int:
+    """Derive location.geo and location.geohash for documents missing either."""
+    cursor = collection.find(
+        {"location.coordinates": {"$exists": True},
+         "$or": [{GEO_FIELD: {"$exists": False}}, {GEOHASH_FIELD: {"$exists": False}}]},
+        {"location": 1},
+    ).batch_size(batch_size)
+
+    updated = 0
+    operations = []
+    async for doc in cursor:
+        location = with_geo(doc["location"])
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            GEO_FIELD: location["geo"], GEOHASH_FIELD: location["geohash"]}}))
+        if len(operations) >= batch_size:
+            updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+    return updated
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from ..client import get_database
+
+    collection = get_database().properties
+    if args.backfill:
+        print(f"Backfilled location.geo and location.geohash on {await backfill_geo(collection)} properties")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Maintain derived geospatial fields on properties.")
+    parser.add_argument("--backfill", action="store_true",
+                        help="derive location.geo and location.geohash where missing")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
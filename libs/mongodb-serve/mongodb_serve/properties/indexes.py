@@ -0,0 +1,324 @@
+"""
+Index registry for the ``properties`` collection.
+
+The registry is the single source of truth for the index strategy documented
+in ``apps/api/api/schemas/property.py``. It can be applied at API startup or
+from the command line:
+
+    python -m mongodb_serve.properties.indexes --apply --check --explain
+"""
+
+import argparse
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, TEXT, IndexModel
+
+from .service import build_filter_query
+
+
+# Indexes keep the driver's default names (e.g. ``location.city_1``), and
+# existing indexes are matched by key, so indexes created by hand before the
+# registry existed count as present instead of conflicting.
+PROPERTY_INDEXES: List[IndexModel] = [
+    IndexModel([("location.city", ASCENDING)]),
+    IndexModel([("property_type", ASCENDING)]),
+    IndexModel([("budget.amount", ASCENDING)]),
+    IndexModel([("isVerified", DESCENDING)]),
+    IndexModel([("created_at", DESCENDING)]),
+    IndexModel(
+        [
+            ("location.city", ASCENDING),
+            ("property_type", ASCENDING),
+            ("budget.amount", ASCENDING),
+        ],
+    ),
+    # Incremental exports by updated_since watermark
+    IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+    # Keyset pagination sort, optionally narrowed to a city
+    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel(
+        [
+            ("location.city", ASCENDING),
+            ("created_at", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+    ),
+    # $geoNear "near me" search, with the type/budget filters as index bounds
+    IndexModel(
+        [
+            ("location.geo", GEOSPHERE),
+            ("property_type", ASCENDING),
+            ("budget.amount", ASCENDING),
+        ],
+    ),
+    # Relevance search; a collection can only have one text index
+    IndexModel(
+        [
+            ("name", TEXT),
+            ("meta.title", TEXT),
+            ("meta.keywords", TEXT),
+            ("location.area", TEXT),
+            ("ai_metadata.tags", TEXT),
+            ("meta.description", TEXT),
+        ],
+        weights={
+            "name": 10,
+            "meta.title": 8,
+            "meta.keywords": 6,
+            "location.area": 6,
+            "ai_metadata.tags": 4,
+            "meta.description": 1,
+        },
+        default_language="english",
+        name="property_text",
+    ),
+]
+
+COMMENT_INDEXES: List[IndexModel] = [
+    # Newest-first comment pages per property
+    IndexModel(
+        [("property_id", ASCENDING), ("posted_at", DESCENDING), ("_id", DESCENDING)],
+    ),
+]
+
+# Sample values for every filter exposed by GET /properties. Each non-empty
+# combination of these is explained against the collection.
+FILTER_SAMPLES: Dict[str, Any] = {
+    "city": "Hyderabad",
+    "property_type": "House",
+    "min_budget": 5000000,
+    "max_budget": 50000000,
+    "is_verified": True,
+}
+
+# Index options that are compared when checking for drift. Versions the
+# server fills in (e.g. 2dsphereIndexVersion) are left out.
+_COMPARED_OPTIONS = (
+    "unique",
+    "sparse",
+    "expireAfterSeconds",
+    "partialFilterExpression",
+    "weights",
+    "default_language",
+)
+
+
+@dataclass
+class IndexDrift:
+    """Difference between the registry and the indexes present in MongoDB."""
+
+    missing: List[str] = field(default_factory=list)
+    unexpected: List[str] = field(default_factory=list)
+    mismatched: List[str] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.missing or self.unexpected or self.mismatched)
+
+
+@dataclass
+class QueryPlanReport:
+    """Winning plan summary for one filter combination."""
+
+    filters: Dict[str, Any]
+    query: Dict[str, Any]
+    stages: List[str]
+    indexes: List[str]
+
+    @property
+    def index_backed(self) -> bool:
+        return bool(self.indexes) and "COLLSCAN" not in self.stages
+
+
+def _normalize_index(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an index document to the parts we compare."""
+    normalized = {"key": [(k, v) for k, v in document["key"].items()]}
+    for option in _COMPARED_OPTIONS:
+        if option in document:
+            normalized[option] = document[option]
+    if any(v == TEXT for _, v in normalized["key"]):
+        _normalize_text_index(normalized)
+    return normalized
+
+
+def _normalize_text_index(normalized: Dict[str, Any]) -> None:
+    """
+    Rewrite a requested text index the way list_indexes() reports it: the
+    text fields collapse into ``_fts``/``_ftsx`` keys and are listed, with
+    their default weight of 1, under ``weights``.
+    """
+    key = []
+    weights = dict(normalized.get("weights", {}))
+    for k, v in normalized["key"]:
+        if v != TEXT or k == "_fts":
+            key.append((k, v))
+            continue
+        weights.setdefault(k, 1)
+        if ("_fts", TEXT) not in key:
+            key += [("_fts", TEXT), ("_ftsx", 1)]
+    normalized["key"] = key
+    normalized["weights"] = weights
+    normalized.setdefault("default_language", "english")
+
+
+def _key(spec: Dict[str, Any]) -> tuple:
+    return tuple(spec["key"])
+
+
+def diff_indexes(existing: List[Dict[str, Any]],
+                 expected: Optional[List[IndexModel]] = None) -> IndexDrift:
+    """
+    Compare ``list_indexes()`` output against the registry. Indexes are
+    matched by key, whatever their name; drift is reported by registry name,
+    and by server name for unexpected indexes.
+    """
+    expected = PROPERTY_INDEXES if expected is None else expected
+    wanted = {model.document["name"]: _normalize_index(model.document)
+              for model in expected}
+    present = {_key(spec): spec for spec in
+               (_normalize_index(doc) for doc in existing if doc["name"] != "_id_")}
+    names = {_key(_normalize_index(doc)): doc["name"] for doc in existing}
+
+    drift = IndexDrift()
+    for name, spec in wanted.items():
+        if _key(spec) not in present:
+            drift.missing.append(name)
+        elif present[_key(spec)] != spec:
+            drift.mismatched.append(name)
+    wanted_keys = {_key(spec) for spec in wanted.values()}
+    drift.unexpected = [names[key] for key in present if key not in wanted_keys]
+    return drift
+
+
+async def _create_missing(collection: AsyncIOMotorCollection, models: List[IndexModel]) -> List[str]:
+    existing = await collection.list_indexes().to_list(length=None)
+    present = {_key(_normalize_index(doc)) for doc in existing}
+    missing = [model for model in models if _key(_normalize_index(model.document)) not in present]
+    return await collection.create_indexes(missing) if missing else []
+
+
+async def ensure_property_indexes(collection: AsyncIOMotorCollection) -> List[str]:
+    """
+    Create the registered indexes whose key is not indexed yet; returns their names.
+    Safe to call repeatedly.
+    """
+    return await _create_missing(collection, PROPERTY_INDEXES)
+
+
+async def ensure_comment_indexes(collection: AsyncIOMotorCollection) -> List[str]:
+    """Create the missing property_comments indexes; safe to call repeatedly."""
+    return await _create_missing(collection, COMMENT_INDEXES)
+
+
+async def check_index_drift(collection: AsyncIOMotorCollection) -> IndexDrift:
+    """Report registered indexes that are missing, unexpected or changed."""
+    existing = await collection.list_indexes().to_list(length=None)
+    return diff_indexes(existing)
+
+
+def filter_combinations() -> List[Dict[str, Any]]:
+    """Every non-empty combination of the GET /properties filters."""
+    names = list(FILTER_SAMPLES)
+    combinations = []
+    for size in range(1, len(names) + 1):
+        for subset in itertools.combinations(names, size):
+            combinations.append({name: FILTER_SAMPLES[name] for name in subset})
+    return combinations
+
+
+def _collect_plan(plan: Dict[str, Any], stages: List[str], indexes: List[str]) -> None:
+    stage = plan.get("stage")
+    if stage:
+        stages.append(stage)
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    # Classic engine nests stages; SBE wraps the plan in "queryPlan".
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            _collect_plan(plan[key], stages, indexes)
+    for child in plan.get("inputStages", []):
+        _collect_plan(child, stages, indexes)
+
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Extract the stages and index names from an ``explain()`` result."""
+    stages: List[str] = []
+    indexes: List[str] = []
+    winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    _collect_plan(winning_plan, stages, indexes)
+    return {"stages": stages, "indexes": indexes}
+
+
+async def explain_filter_combinations(
+    collection: AsyncIOMotorCollection,
+) -> List[QueryPlanReport]:
+    """Explain each filter combination produced by the /properties router."""
+    reports = []
+    for filters in filter_combinations():
+        query = build_filter_query(**filters)
+        explain = await collection.find(query).explain()
+        plan = summarize_plan(explain)
+        reports.append(QueryPlanReport(
+            filters=filters,
+            query=query,
+            stages=plan["stages"],
+            indexes=plan["indexes"],
+        ))
+    return reports
+
+
+async def _run(args: argparse.Namespace) -> int:
+    from ..client import get_database
+
+    database = get_database()
+    collection = database.properties
+    status = 0
+
+    if args.apply:
+        created = await ensure_property_indexes(collection)
+        created += await ensure_comment_indexes(database.property_comments)
+        print(f"Created indexes: {', '.join(created) or '-'}")
+
+    if args.check:
+        drift = await check_index_drift(collection)
+        print(f"Missing: {drift.missing or '-'}")
+        print(f"Unexpected: {drift.unexpected or '-'}")
+        print(f"Mismatched: {drift.mismatched or '-'}")
+        if drift.missing or drift.mismatched:
+            status = 1
+
+    if args.explain:
+        for report in await explain_filter_combinations(collection):
+            marker = "ok  " if report.index_backed else "SCAN"
+            used = ", ".join(report.indexes) or "-"
+            print(f"[{marker}] {sorted(report.filters)} -> {used}")
+            if not report.index_backed:
+                status = 1
+
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Manage indexes on the properties collection.")
+    parser.add_argument("--apply", action="store_true",
+                        help="create missing indexes")
+    parser.add_argument("--check", action="store_true",
+                        help="report drift against list_indexes()")
+    parser.add_argument("--explain", action="store_true",
+                        help="verify every filter combination is index-backed")
+    args = parser.parse_args(argv)
+    if not (args.apply or args.check or args.explain):
+        args.check = True
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
@@ -76,6 +76,13 @@ class Coordinates(BaseModel):
     longitude: float
 
 
+class GeoPoint(BaseModel):
+    """GeoJSON point; coordinates are [longitude, latitude]"""
+
+    type: str = "Point"
+    coordinates: List[float]
+
+
 class Location(BaseModel):
     city: str
     area: str
@@ -84,6 +91,8 @@ class Location(BaseModel):
     state: str
     country: str
     coordinates: Coordinates
+    # Derived from coordinates on every write (see geo.py), 2dsphere indexed
+    geo: Optional[GeoPoint] = None
 
 
 class Landmark(BaseModel):
@@ -188,6 +197,26 @@ class Comment(BaseModel):
     verified_buyer: bool
 
 
+class CommentCreate(BaseModel):
+    """Model for posting a comment on a property"""
+
+    user_id: str
+    user_name: str
+    rating: int = Field(ge=1, le=5)
+    comment: str
+    verified_buyer: bool = False
+
+
+class PropertyComment(Comment):
+    """A comment stored in the property_comments collection"""
+
+    id: Optional[str] = Field(default=None, alias="_id")
+    property_id: str
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class Image(BaseModel):
     url: str
     type: str
@@ -284,6 +313,27 @@ class Property(BaseModel):
         }
 
 
+class PropertySummary(BaseModel):
+    """Lightweight listing card (see projections.SUMMARY_PROJECTION)"""
+
+    id: Optional[str] = Field(default=None, alias="_id")
+    name: str
+    property_type: PropertyType
+    location: Location
+    budget: Budget
+    specifications: Specifications
+    # Only the primary image is projected
+    images: List[Image] = []
+    isVerified: bool
+    slug: str
+    status: Status
+    featured: bool
+    created_at: datetime
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class PropertyCreate(BaseModel):
     """Model for creating new properties (excludes auto-generated fields)"""
 
@@ -325,8 +375,7 @@ class PropertyCreate(BaseModel):
     views: int = 0
     inquiries: int = 0
 
-    # Comments/Reviews
-    comments: List[Comment] = []
+    # Comments are posted through add_comment, not written with the property
 
     # Media
     images: List[Image] = []
@@ -386,8 +435,7 @@ class PropertyUpdate(BaseModel):
     views: Optional[int] = None
     inquiries: Optional[int] = None
 
-    # Comments/Reviews
-    comments: Optional[List[Comment]] = None
+    # Comments are posted through add_comment, not written with the property
 
     # Media
     images: Optional[List[Image]] = None
@@ -404,3 +452,127 @@ class PropertyUpdate(BaseModel):
 
     # AI/ML Fields
     ai_metadata: Optional[AIMetadata] = None
+
+
+class PropertyPage(BaseModel):
+    """A page of properties from keyset (cursor) pagination"""
+
+    items: List[Property]
+    # Opaque token for the next page, None on the last page
+    next_cursor: Optional[str] = None
+    # Properties matching the filters, when requested with count
+    total: Optional[int] = None
+
+
+class NearbyProperty(PropertySummary):
+    """Property summary with its distance from the search point"""
+
+    distance_km: float
+
+
+class SearchResult(PropertySummary):
+    """Property summary with its text search relevance"""
+
+    score: float
+
+
+class FacetCount(BaseModel):
+    value: Union[str, int]
+    count: int
+
+
+class BudgetBand(BaseModel):
+    min: int
+    max: Optional[int] = None  # exclusive, None for the open-ended top band
+    count: int
+
+
+class PropertyFacets(BaseModel):
+    """Counts per filter value for the listing sidebar"""
+
+    total: int
+    city: List[FacetCount]
+    property_type: List[FacetCount]
+    furnished: List[FacetCount]
+    bedrooms: List[FacetCount]
+    budget: List[BudgetBand]
+
+
+class Suggestion(BaseModel):
+    """Autocomplete suggestion; count is the number of properties using it"""
+
+    text: str
+    kind: Literal["city", "area", "name"]
+    count: int
+
+
+class MapMarker(BaseModel):
+    """Minimal listing data for a map pin"""
+
+    id: str = Field(alias="_id")
+    property_type: PropertyType
+    price: int
+    latitude: float
+    longitude: float
+
+    class Config:
+        allow_population_by_field_name = True
+
+
+class MapMarkers(BaseModel):
+    """Map pins in a viewport; truncated when more listings matched than returned"""
+
+    items: List[MapMarker]
+    truncated: bool
+
+
+class MarkerCluster(BaseModel):
+    """Properties sharing a geohash prefix, drawn as one map marker"""
+
+    geohash: str
+    count: int
+    # Centroid of the clustered properties
+    latitude: float
+    longitude: float
+    min_price: int
+    # Mean price on servers older than MongoDB 7.0, which lack $median
+    median_price: float
+
+
+class PropertySummaryPage(BaseModel):
+    """A page of property summaries from keyset (cursor) pagination"""
+
+    items: List[PropertySummary]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class BulkPatchItem(BaseModel):
+    """One entry of a bulk patch request"""
+
+    id: str
+    update: PropertyUpdate
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of one item in a bulk request"""
+
+    index: int  # position in the request body
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    """Per-item outcomes of a bulk request"""
+
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class CommentPage(BaseModel):
+    """A page of comments, newest first"""
+
+    items: List[PropertyComment]
+    next_cursor: Optional[str] = None
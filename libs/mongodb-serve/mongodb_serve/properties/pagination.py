@@ -0,0 +1,61 @@
+"""
+Keyset pagination helpers for property listings.
+
+A cursor is an opaque, URL-safe token holding the sort key and ``_id`` of the
+last document on a page. The next page is fetched with a range predicate on
+``(created_at, _id)`` instead of ``skip``, so it is served straight from the
+``created_at_-1__id_-1`` index no matter how deep the client pages. Other
+descending sort fields (e.g. comment ``posted_at``) can be passed explicitly.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from bson import json_util
+
+SORT_FIELD = "created_at"
+SORT = [(SORT_FIELD, -1), ("_id", -1)]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(document: Dict[str, Any], sort_field: str = SORT_FIELD) -> str:
+    """Build the cursor pointing just after ``document``."""
+    payload = json_util.dumps({"k": document.get(sort_field), "id": document["_id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], str]:
+    """
+    Return the ``(sort key, _id)`` pair stored in a cursor. Sort keys are
+    datetimes (None for documents missing the field) and ids are strings;
+    anything else would put an operator or a mistyped value into the range
+    query, so it is rejected.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_key, last_id = payload["k"], payload["id"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError,
+            KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+    if not (sort_key is None or isinstance(sort_key, datetime)) or not isinstance(last_id, str):
+        raise InvalidCursorError("Invalid pagination cursor")
+    return sort_key, last_id
+
+
+def apply_cursor(query: Dict[str, Any], token: Optional[str], sort_field: str = SORT_FIELD) -> Dict[str, Any]:
+    """Restrict ``query`` to documents sorted after the cursor position."""
+    if not token:
+        return query
+    sort_key, last_id = decode_cursor(token)
+    after = {"$or": [
+        {sort_field: {"$lt": sort_key}},
+        {sort_field: sort_key, "_id": {"$lt": last_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
@@ -0,0 +1,64 @@
+"""
+MongoDB projections for property listings.
+
+Listing pages rarely need comments, verification documents, videos or meta,
+so these projections keep them on the server instead of transferring,
+decoding and re-encoding them for every card.
+"""
+
+from typing import Dict, List
+
+from .models import Property, PropertySummary
+
+# Fields of PropertySummary, with images narrowed to the primary one
+SUMMARY_PROJECTION: Dict[str, object] = {
+    **{
+        (field.alias or name): 1
+        for name, field in PropertySummary.model_fields.items()
+    },
+    "images": {"$elemMatch": {"is_primary": True}},
+}
+
+# SUMMARY_PROJECTION for a $project stage, where $elemMatch is not allowed
+SUMMARY_STAGE: Dict[str, object] = {
+    **SUMMARY_PROJECTION,
+    "images": {"$slice": [
+        {"$filter": {"input": {"$ifNull": ["$images", []]}, "cond": "$$this.is_primary"}},
+        1,
+    ]},
+}
+
+# Flattened MapMarker fields, computed on the server
+MARKER_PROJECTION: Dict[str, object] = {
+    "property_type": 1,
+    "price": "$budget.amount",
+    "latitude": "$location.coordinates.latitude",
+    "longitude": "$location.coordinates.longitude",
+}
+
+_PROPERTY_FIELDS = {field.alias or name for name, field in Property.model_fields.items()}
+
+
+class UnknownFieldError(ValueError):
+    """Raised when a sparse fieldset names a field Property does not have, or overlapping paths."""
+
+
+def sparse_projection(fields: List[str]) -> Dict[str, int]:
+    """
+    Build an inclusion projection for a sparse fieldset.
+    Nested paths such as ``location.city`` are allowed; ``_id`` is always returned.
+    A path and one nested inside it (``location,location.city``) would be a
+    path collision on the server, so they are rejected.
+    """
+    projection = {"_id": 1}
+    for path in fields:
+        path = path.strip()
+        if not path:
+            continue
+        if path.split(".", 1)[0] not in _PROPERTY_FIELDS:
+            raise UnknownFieldError(f"Unknown field: {path}")
+        for other in projection:
+            if path.startswith(other + ".") or other.startswith(path + "."):
+                raise UnknownFieldError(f"Overlapping fields: {other} and {path}")
+        projection[path] = 1
+    return projection
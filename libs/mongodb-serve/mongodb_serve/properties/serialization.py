@@ -0,0 +1,72 @@
+"""
+Trusted read path for property documents.
+
+Documents in the properties collection are validated by the Property models
+when they are written, so validating them again on every read (and once more
+against the route's response_model) only costs CPU. These helpers encode raw
+documents straight to JSON instead.
+
+Only top-level defaults are filled in. Nested defaults (e.g.
+``budget.currency``) appear only where they were stored: new documents store
+the full model dump, but older ones may lack them and then differ from the
+validated output.
+"""
+
+from typing import Any, Dict, Type
+
+from bson import ObjectId
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_json
+
+from .models import Property
+
+_defaults_cache: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+# Stored for map clustering (see geo.py) but on no model, so the validated
+# path never returns it
+_INTERNAL_LOCATION_FIELDS = ("geohash",)
+
+
+def _model_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    if model not in _defaults_cache:
+        _defaults_cache[model] = {
+            (field.alias or name): field.default
+            for name, field in model.model_fields.items()
+            if field.default is not PydanticUndefined
+        }
+    return _defaults_cache[model]
+
+
+def strip_internal(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a raw document without internal fields, e.g. for sparse fieldsets."""
+    location = document.get("location")
+    if isinstance(location, dict) and any(field in location for field in _INTERNAL_LOCATION_FIELDS):
+        document = {**document, "location": {
+            key: value for key, value in location.items() if key not in _INTERNAL_LOCATION_FIELDS
+        }}
+    return document
+
+
+def apply_defaults(document: Dict[str, Any], model: Type[BaseModel] = Property) -> Dict[str, Any]:
+    """
+    Fill in the top-level defaults ``model`` would add for missing fields and
+    drop internal fields. Other nested documents are returned as stored.
+    Default values are shared, so the result is meant to be serialized, not
+    mutated.
+    """
+    return strip_internal({**_model_defaults(model), **document})
+
+
+def _encode_bson(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode raw MongoDB documents as compact JSON.
+    Uses pydantic-core's serializer, so datetimes are formatted exactly as on
+    the validated path.
+    """
+    return to_json(content, fallback=_encode_bson)
@@ -1,12 +1,388 @@
-from typing import List, Optional
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Type
+from bson import ObjectId, json_util
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from .models import Property
+from pydantic import BaseModel, ValidationError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from .cache import TTLCache
+from .ann import SimilarityIndex, build_similarity_index
+from .counters import COUNTER_FIELDS, COUNTER_WRITE_CONCERN, CounterBuffer
+from .geo import (
+    GEO_FIELD,
+    GEOHASH_FIELD,
+    box_polygon,
+    cluster_precision,
+    geo_point,
+    tile_bounds,
+    with_geo,
+)
+from .models import (
+    BulkItemResult,
+    BulkPatchItem,
+    BulkResult,
+    Comment,
+    CommentCreate,
+    Property,
+    PropertyComment,
+    PropertyCreate,
+    SimilarProperty,
+)
+from .pagination import SORT, SORT_FIELD, apply_cursor, encode_cursor
+from .projections import MARKER_PROJECTION
+from .similar import SIMILARITY_PROJECTION
+from .suggest import (
+    SUGGEST_FIELDS,
+    SUGGEST_PROJECTION,
+    SuggestIndex,
+    Term,
+    document_deltas,
+    load_term_counts,
+    update_deltas,
+)
+
+# Documents per getMore while exporting; ~3.5 KB each keeps batches under 2 MB
+EXPORT_BATCH_SIZE = 500
+EXPORT_SORT = [("_id", 1)]
+# Watermark exports follow updated_at, so they can resume from the last one seen
+EXPORT_SINCE_SORT = [("updated_at", 1), ("_id", 1)]
+
+# Text search results, most relevant first; _id keeps equal scores in a stable order
+TEXT_SCORE = {"$meta": "textScore"}
+SEARCH_SORT = [("score", TEXT_SCORE), ("_id", 1)]
+
+# Lower bounds (rupees) of the budget bands shown in the filter sidebar; the
+# last band is open ended
+BUDGET_BANDS = [0, 2500000, 5000000, 10000000, 20000000, 50000000, 100000000]
+
+# Sidebar facets counted with $sortByCount, by facet name
+FACET_FIELDS = {
+    "city": "location.city",
+    "property_type": "property_type",
+    "furnished": "specifications.furnished",
+    "bedrooms": "specifications.bedrooms",
+}
+
+# Most recent comments kept embedded in the property document; the full
+# history lives in the property_comments collection
+EMBEDDED_COMMENTS = 5
+COMMENT_SORT = [("posted_at", -1), ("_id", -1)]
+
+
+def build_filter_query(
+    city: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_budget: Optional[int] = None,
+    max_budget: Optional[int] = None,
+    is_verified: Optional[bool] = None,
+) -> dict:
+    """Build the MongoDB query used by the property listing filters."""
+    query = {}
+    if city:
+        query["location.city"] = city
+    if property_type:
+        query["property_type"] = property_type
+    if min_budget or max_budget:
+        budget_query = {}
+        if min_budget:
+            budget_query["$gte"] = min_budget
+        if max_budget:
+            budget_query["$lte"] = max_budget
+        query["budget.amount"] = budget_query
+    if is_verified is not None:
+        query["isVerified"] = is_verified
+    return query
+
+
+def to_models(documents: List[dict], model: Optional[Type[BaseModel]]) -> List[Any]:
+    """Convert raw documents to ``model``; ``model=None`` returns them as-is."""
+    if model is None:
+        return documents
+    return [model(**doc) for doc in documents]
+
+
+def new_property_document(property_data: PropertyCreate) -> dict:
+    """
+    Build the stored document for a new property, with id and timestamps.
+    Defaults are stored too, so the document validates as a Property and
+    filters on defaulted fields (isVerified, status, ...) match it.
+    """
+    doc = property_data.dict(by_alias=True)
+    now = datetime.now(timezone.utc)
+    doc["_id"] = str(ObjectId())
+    doc["location"] = with_geo(doc["location"])
+    doc["created_at"] = now
+    doc["updated_at"] = now
+    return doc
+
+
+def new_comment_document(property_id: str, comment: CommentCreate) -> dict:
+    """Build the stored document for a new comment."""
+    doc = comment.dict()
+    doc["_id"] = str(ObjectId())
+    doc["property_id"] = property_id
+    doc["posted_at"] = datetime.now(timezone.utc)
+    doc["helpful_count"] = 0
+    return doc
+
+
+def push_recent_comments(comments: List[dict], limit: int) -> dict:
+    """$push update that keeps only the ``limit`` newest embedded comments."""
+    return {"$push": {"comments": {
+        "$each": comments,
+        "$sort": {"posted_at": -1},
+        "$slice": limit,
+    }}}
+
+
+def set_update(update_data: dict) -> dict:
+    """Build the $set update for changed fields, refreshing updated_at and derived fields."""
+    if "location" in update_data:
+        update_data = {**update_data, "location": with_geo(update_data["location"])}
+    return {"$set": {**update_data, "updated_at": datetime.now(timezone.utc)}}
+
+
+def query_cache_key(*parts: Any) -> str:
+    """Canonical, hashable key for a query; dict key order does not matter."""
+    return json_util.dumps(parts, sort_keys=True)
+
+
+def facet_pipeline(query: dict) -> List[dict]:
+    """One $facet aggregation computing every sidebar facet for ``query``."""
+    facets = {name: [{"$sortByCount": "$" + field}] for name, field in FACET_FIELDS.items()}
+    facets["total"] = [{"$count": "count"}]
+    facets["budget"] = [{"$bucket": {
+        "groupBy": "$budget.amount",
+        "boundaries": BUDGET_BANDS,
+        # Amounts at or above the last bound
+        "default": "open",
+        "output": {"count": {"$sum": 1}},
+    }}]
+    return [{"$match": query}, {"$facet": facets}]
+
+
+def cluster_pipeline(query: dict, precision: int, median: bool = True) -> List[dict]:
+    """
+    Group properties matching ``query`` by geohash prefix. The median price
+    needs MongoDB 7.0 ($median); with ``median=False`` it is the mean instead.
+    """
+    price = "$budget.amount"
+    return [
+        {"$match": query},
+        {"$group": {
+            "_id": {"$substrBytes": ["$" + GEOHASH_FIELD, 0, precision]},
+            "count": {"$sum": 1},
+            "latitude": {"$avg": "$location.coordinates.latitude"},
+            "longitude": {"$avg": "$location.coordinates.longitude"},
+            "min_price": {"$min": price},
+            "median_price": {"$median": {"input": price, "method": "approximate"}} if median else {"$avg": price},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "geohash": "$_id",
+            "count": 1,
+            "latitude": 1,
+            "longitude": 1,
+            "min_price": 1,
+            "median_price": 1,
+        }},
+    ]
+
+
+def facet_counts(result: dict) -> dict:
+    """Reshape the $facet output into PropertyFacets fields."""
+    upper = dict(zip(BUDGET_BANDS, BUDGET_BANDS[1:]))
+    lower = {"open": BUDGET_BANDS[-1]}
+    facets = {
+        name: [{"value": row["_id"], "count": row["count"]} for row in result[name] if row["_id"] is not None]
+        for name in FACET_FIELDS
+    }
+    facets["total"] = result["total"][0]["count"] if result["total"] else 0
+    facets["budget"] = [
+        {"min": lower.get(row["_id"], row["_id"]), "max": upper.get(row["_id"]), "count": row["count"]}
+        for row in result["budget"]
+    ]
+    return facets
+
+
+def _changes_similarity(update_data: dict) -> bool:
+    """Whether an update touches a field the similar-listing index reads."""
+    return any(field.split(".")[0] in update_data for field in SIMILARITY_PROJECTION)
+
+
+def _changes_suggestions(update_data: dict) -> bool:
+    """Whether an update touches a field autocomplete terms come from."""
+    return any(field.split(".")[0] in update_data for field in SUGGEST_FIELDS.values())
+
+
+def _bulk_result(results: List[BulkItemResult]) -> BulkResult:
+    succeeded = sum(1 for result in results if result.ok)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
 
 
 class PropertyService:
-    def __init__(self, database: AsyncIOMotorDatabase):
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        cache_size: int = 1024,
+        cache_ttl: float = 60.0,
+        query_cache_size: int = 20000,
+        query_cache_ttl: float = 10.0,
+        cluster_cache_size: int = 4096,
+        cluster_cache_ttl: float = 60.0,
+        count_cache_size: int = 1024,
+        count_cache_ttl: float = 30.0,
+        counter_flush_interval: float = 1.0,
+        embedded_comments: int = EMBEDDED_COMMENTS
+    ):
         self.database = database
         self.collection = database.properties
+        self.comments = database.property_comments
+        self.embedded_comments = embedded_comments
+        # Raw documents by _id for get_property_by_id; cache_size=0 disables it
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # Raw listing results by canonical query, bounded by documents held
+        self.query_cache = TTLCache(
+            maxsize=query_cache_size, ttl=query_cache_ttl,
+            weigh=lambda documents: len(documents) + 1)
+        # Map clusters by (tile, filters); expire by TTL only, since clusters
+        # tolerate slightly stale counts and writes would otherwise flush them constantly
+        self.cluster_cache = TTLCache(maxsize=cluster_cache_size, ttl=cluster_cache_ttl)
+        # Cleared once the server rejects $median (MongoDB < 7.0)
+        self._cluster_median = True
+        # Filtered listing totals by canonical query, cleared with listings
+        self.count_cache = TTLCache(maxsize=count_cache_size, ttl=count_cache_ttl)
+        # Bumped by every invalidation; a read that spans a bump may have seen
+        # the old document, so its result is returned but not cached
+        self._generation = 0
+        # Autocomplete terms; writes add to it, refresh_suggestions() rebuilds it
+        self.suggestions = SuggestIndex()
+        # Term count changes made while refresh_suggestions() loads a replacement
+        self._suggest_written: Optional[List[Dict[Term, int]]] = None
+        # Similar-listing index; None until refresh_similarity_index() first builds it
+        self.similar_index: Optional[SimilarityIndex] = None
+        # Ids written while refresh_similarity_index() builds a replacement
+        self._similar_written: Optional[Set[str]] = None
+        # Write-behind buffer for counter bumps; started by the API on startup
+        self.counters = CounterBuffer(self.collection, flush_interval=counter_flush_interval)
+
+    def invalidate(self, *property_ids: str) -> None:
+        """Drop cached copies after a write; listings are cleared wholesale."""
+        self._generation += 1
+        for property_id in property_ids:
+            self.cache.invalidate(property_id)
+        self.query_cache.clear()
+        self.count_cache.clear()
+
+    def clear_caches(self) -> None:
+        """Drop every cached entry, e.g. when writes may have been missed."""
+        self._generation += 1
+        self.cache.clear()
+        self.query_cache.clear()
+        self.cluster_cache.clear()
+        self.count_cache.clear()
+
+    async def _find_cached(self, query: dict, projection: Optional[dict], **options: Any) -> List[dict]:
+        """Run a listing find (sort/skip/limit options), cached by its canonical form."""
+        key = query_cache_key(query, projection, options)
+        documents = self.query_cache.get(key)
+        if documents is None:
+            generation = self._generation
+            cursor = self.collection.find(query, projection)
+            if "sort" in options:
+                cursor = cursor.sort(options["sort"])
+            cursor = cursor.skip(options.get("skip", 0)).limit(options["limit"])
+            documents = await cursor.to_list(length=None)
+            if generation == self._generation:
+                self.query_cache.set(key, documents)
+        return documents
+
+    async def refresh_suggestions(self) -> int:
+        """Rebuild the autocomplete index from the collection; returns its term count."""
+        self._suggest_written = []
+        try:
+            counts = await load_term_counts(self.collection)
+            index = SuggestIndex(fuzzy_threshold=self.suggestions.fuzzy_threshold)
+            # Sorting the suffixes of 100k terms takes seconds, so keep it off the event loop
+            await asyncio.to_thread(index.replace, counts)
+            # Replay writes made since loading began; one the aggregate already
+            # saw is counted twice until the next refresh, which only nudges ranking
+            for deltas in self._suggest_written:
+                index.apply(deltas)
+            self.suggestions = index
+        finally:
+            self._suggest_written = None
+        return len(self.suggestions)
+
+    def count_terms(self, deltas: Dict[Term, int]) -> None:
+        """Apply autocomplete term count changes, also to the index being rebuilt."""
+        if not deltas:
+            return
+        self.suggestions.apply(deltas)
+        if self._suggest_written is not None:
+            self._suggest_written.append(deltas)
+
+    async def refresh_similarity_index(self) -> int:
+        """Rebuild the similar-listing index from the collection; returns its size."""
+        self._similar_written = set()
+        try:
+            documents = await self.collection.find({}, SIMILARITY_PROJECTION).to_list(length=None)
+            # Hashing the whole catalog takes seconds, so keep it off the event loop
+            index = await asyncio.to_thread(build_similarity_index, documents)
+            # Replay listings written while building. The swap follows the
+            # last (empty) check without awaiting, so no write falls in between
+            while self._similar_written:
+                written, self._similar_written = self._similar_written, set()
+                cursor = self.collection.find({"_id": {"$in": list(written)}}, SIMILARITY_PROJECTION)
+                current = await cursor.to_list(length=None)
+                index.add_many(current)
+                for property_id in written - {doc["_id"] for doc in current}:
+                    index.remove(property_id)
+            self.similar_index = index
+        finally:
+            self._similar_written = None
+        return len(index)
+
+    def index_similar(self, documents: List[dict]) -> None:
+        """Add or re-index listings in the similar-listing index."""
+        if self._similar_written is not None:
+            self._similar_written.update(doc["_id"] for doc in documents)
+        if self.similar_index is not None:
+            self.similar_index.add_many(documents)
+
+    def unindex_similar(self, property_id: str) -> None:
+        """Drop a deleted listing from the similar-listing index."""
+        if self._similar_written is not None:
+            self._similar_written.add(property_id)
+        if self.similar_index is not None:
+            self.similar_index.remove(property_id)
+
+    async def _reindex_similar(self, property_ids: List[str]) -> None:
+        """Re-read listings whose features may have changed into the similar-listing index."""
+        if self._similar_written is not None:
+            self._similar_written.update(property_ids)
+        if self.similar_index is None or not property_ids:
+            return
+        cursor = self.collection.find({"_id": {"$in": property_ids}}, SIMILARITY_PROJECTION)
+        self.similar_index.add_many(await cursor.to_list(length=None))
+
+    async def get_similar_properties(self, property_id: str, k: int = 10) -> Optional[List[SimilarProperty]]:
+        """
+        The ``k`` listings most similar to a property, from the in-memory index.
+        Returns None when no property has this ID. The index must have been built.
+        """
+        similar = self.similar_index.similar(property_id, k)
+        if similar is None:
+            # Inserted by another worker since the last rebuild
+            doc = await self.collection.find_one({"_id": property_id}, SIMILARITY_PROJECTION)
+            if not doc:
+                return None
+            self.index_similar([doc])
+            similar = self.similar_index.similar(property_id, k)
+        return [SimilarProperty(**item) for item in similar]
 
     async def get_all_properties(self, skip: int = 0, limit: int = 100) -> List[Property]:
         """Fetch all properties with pagination."""
@@ -14,10 +390,21 @@ class PropertyService:
         documents = await cursor.to_list(length=None)
         return [Property(**doc) for doc in documents]
 
-    async def get_property_by_id(self, property_id: str) -> Optional[Property]:
-        """Fetch a single property by ID."""
-        doc = await self.collection.find_one({"_id": property_id})
-        return Property(**doc) if doc else None
+    async def get_property_by_id(
+        self,
+        property_id: str,
+        model: Optional[Type[BaseModel]] = Property
+    ) -> Optional[Any]:
+        """Fetch a single property by ID, served from the cache when possible."""
+        doc = self.cache.get(property_id)
+        if doc is None:
+            generation = self._generation
+            doc = await self.collection.find_one({"_id": property_id})
+            if not doc:
+                return None
+            if generation == self._generation:
+                self.cache.set(property_id, doc)
+        return model(**doc) if model else doc
 
     async def get_properties_by_filters(
         self,
@@ -27,46 +414,522 @@ class PropertyService:
         max_budget: Optional[int] = None,
         is_verified: Optional[bool] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[Property]:
-        """Fetch properties with filters."""
-        query = {}
-        if city:
-            query["location.city"] = city
-        if property_type:
-            query["property_type"] = property_type
-        if min_budget or max_budget:
-            budget_query = {}
-            if min_budget:
-                budget_query["$gte"] = min_budget
-            if max_budget:
-                budget_query["$lte"] = max_budget
-            query["budget.amount"] = budget_query
-        if is_verified is not None:
-            query["isVerified"] = is_verified
-
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        documents = await cursor.to_list(length=None)
-        return [Property(**doc) for doc in documents]
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None,
+        model: Optional[Type[BaseModel]] = Property
+    ) -> List[Any]:
+        """
+        Fetch properties with filters.
+        A projection is pushed down to MongoDB; pass the matching ``model``
+        (or None for raw documents) when it does not return full properties.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
 
-    async def create_property(self, property_data: Property) -> Property:
+        documents = await self._find_cached(query, projection, skip=skip, limit=limit)
+        return to_models(documents, model)
+
+    async def get_properties_page(
+        self,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None,
+        model: Optional[Type[BaseModel]] = Property
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Fetch a page of filtered properties, newest first, after the cursor."""
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        query = apply_cursor(query, cursor)
+        if projection is not None:
+            # The sort key is needed to build the next cursor
+            projection = {**projection, SORT_FIELD: 1}
+
+        # Read one extra document to know whether another page exists
+        documents = await self._find_cached(query, projection, sort=SORT, limit=limit + 1)
+        next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+        return to_models(documents[:limit], model), next_cursor
+
+    async def iter_properties(
+        self,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        updated_since: Optional[datetime] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate raw property documents in _id order without loading them all.
+        With updated_since they come in (updated_at, _id) order instead.
+        Only one batch is held in memory at a time.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        sort = EXPORT_SORT
+        if updated_since:
+            query["updated_at"] = {"$gte": updated_since}
+            sort = EXPORT_SINCE_SORT
+
+        cursor = self.collection.find(query).sort(sort).batch_size(batch_size)
+        async for doc in cursor:
+            yield doc
+
+    async def count_properties(
+        self,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        exact: bool = False
+    ) -> int:
+        """
+        Count the properties matching the listing filters.
+        Approximate counts use collection metadata when nothing is filtered
+        and a cached count_documents otherwise, which writes clear; exact
+        counts always run count_documents.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        if not exact and not query:
+            # Read from collection metadata; may drift after unclean shutdowns
+            return await self.collection.estimated_document_count()
+        key = query_cache_key(query)
+        total = None if exact else self.count_cache.get(key)
+        if total is None:
+            generation = self._generation
+            total = await self.collection.count_documents(query)
+            if generation == self._generation:
+                self.count_cache.set(key, total)
+        return total
+
+    async def get_property_facets(
+        self,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None
+    ) -> dict:
+        """
+        Count the filtered properties per city, type, furnishing, bedrooms
+        and budget band with a single aggregation.
+        Cached alongside listings, so writes clear it.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        key = query_cache_key("facets", query)
+        facets = self.query_cache.get(key)
+        if facets is None:
+            generation = self._generation
+            result = await self.collection.aggregate(facet_pipeline(query)).to_list(length=None)
+            facets = facet_counts(result[0])
+            if generation == self._generation:
+                self.query_cache.set(key, facets)
+        return facets
+
+    async def search_properties(
+        self,
+        text: str,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 20,
+        projection: Optional[Dict[str, Any]] = None,
+        model: Optional[Type[BaseModel]] = None
+    ) -> List[Any]:
+        """
+        Full-text search over the property_text index, most relevant first.
+        Each document carries its relevance ``score``.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        query["$text"] = {"$search": text}
+        projection = {**(projection or {}), "score": TEXT_SCORE}
+
+        documents = await self._find_cached(query, projection, sort=SEARCH_SORT, skip=skip, limit=limit)
+        return to_models(documents, model)
+
+    async def get_properties_near(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        city: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        limit: int = 50,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[dict]:
+        """
+        Fetch raw property documents within ``radius_km`` of a point, nearest
+        first, each with its ``distance_km``. The listing filters are applied
+        inside $geoNear so they narrow the 2dsphere index scan.
+        """
+        query = build_filter_query(
+            city=city,
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        pipeline = [
+            {"$geoNear": {
+                "near": geo_point({"latitude": latitude, "longitude": longitude}),
+                "key": GEO_FIELD,
+                "distanceField": "distance_km",
+                "distanceMultiplier": 0.001,
+                "maxDistance": radius_km * 1000,
+                "query": query,
+                "spherical": True,
+            }},
+            {"$limit": limit},
+        ]
+        if projection is not None:
+            pipeline.append({"$project": {**projection, "distance_km": 1}})
+        return await self.collection.aggregate(pipeline).to_list(length=None)
+
+    async def get_properties_in_bounds(
+        self,
+        south: float,
+        west: float,
+        north: float,
+        east: float,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None,
+        limit: int = 500
+    ) -> Tuple[List[dict], bool]:
+        """
+        Fetch map markers (raw, see MARKER_PROJECTION) inside a viewport.
+        Returns at most ``limit`` markers and whether more properties matched.
+        """
+        query = build_filter_query(
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        query[GEO_FIELD] = {"$geoWithin": {"$geometry": box_polygon(south, west, north, east)}}
+
+        # Read one extra document to know whether the result was capped
+        documents = await self._find_cached(query, MARKER_PROJECTION, limit=limit + 1)
+        return documents[:limit], len(documents) > limit
+
+    async def get_property_clusters(
+        self,
+        zoom: int,
+        x: int,
+        y: int,
+        property_type: Optional[str] = None,
+        min_budget: Optional[int] = None,
+        max_budget: Optional[int] = None,
+        is_verified: Optional[bool] = None
+    ) -> List[dict]:
+        """
+        Group the properties inside a map tile by geohash prefix.
+        Each cluster has its count, centroid and minimum and median price
+        (the mean price on servers older than MongoDB 7.0).
+        """
+        filters = build_filter_query(
+            property_type=property_type,
+            min_budget=min_budget,
+            max_budget=max_budget,
+            is_verified=is_verified,
+        )
+        key = query_cache_key(zoom, x, y, filters)
+        clusters = self.cluster_cache.get(key)
+        if clusters is not None:
+            return clusters
+
+        query = {**filters, GEO_FIELD: {"$geoWithin": {"$geometry": box_polygon(*tile_bounds(zoom, x, y))}}}
+        precision = cluster_precision(zoom)
+        try:
+            pipeline = cluster_pipeline(query, precision, median=self._cluster_median)
+            clusters = await self.collection.aggregate(pipeline).to_list(length=None)
+        except OperationFailure as e:
+            if not self._cluster_median or "$median" not in str(e):
+                raise
+            # Servers before MongoDB 7.0 have no $median; report the mean price from now on
+            self._cluster_median = False
+            pipeline = cluster_pipeline(query, precision, median=False)
+            clusters = await self.collection.aggregate(pipeline).to_list(length=None)
+        self.cluster_cache.set(key, clusters)
+        return clusters
+
+    async def create_property(self, property_data: PropertyCreate) -> Property:
         """Create a new property."""
-        doc = property_data.dict(by_alias=True, exclude_unset=True)
-        result = await self.collection.insert_one(doc)
-        doc["_id"] = result.inserted_id
+        doc = new_property_document(property_data)
+        await self.collection.insert_one(doc)
+        self.invalidate()
+        self.count_terms(document_deltas([doc]))
+        self.index_similar([doc])
         return Property(**doc)
 
-    async def update_property(self, property_id: str, update_data: dict) -> Optional[Property]:
-        """Update a property."""
-        result = await self.collection.update_one(
+    async def create_properties(self, items: List[dict]) -> BulkResult:
+        """
+        Validate and insert a batch of properties with one unordered insert_many.
+        Invalid or rejected items are reported per index and do not stop the rest.
+        """
+        results = [BulkItemResult(index=index, ok=False) for index in range(len(items))]
+        documents = []
+        positions = []  # request index of each entry in documents
+        for index, item in enumerate(items):
+            try:
+                documents.append(new_property_document(PropertyCreate(**item)))
+                positions.append(index)
+            except ValidationError as e:
+                results[index].error = str(e)
+
+        write_errors = {}
+        if documents:
+            try:
+                await self.collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                write_errors = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+            self.invalidate()
+
+        inserted = []
+        for position, (index, doc) in enumerate(zip(positions, documents)):
+            if position in write_errors:
+                results[index].error = write_errors[position]
+            else:
+                results[index].ok = True
+                results[index].id = doc["_id"]
+                inserted.append(doc)
+        self.count_terms(document_deltas(inserted))
+        self.index_similar(inserted)
+
+        return _bulk_result(results)
+
+    async def update_property(
+        self,
+        property_id: str,
+        update_data: dict,
+        projection: Optional[Dict[str, Any]] = None,
+        model: Optional[Type[BaseModel]] = Property
+    ) -> Optional[Any]:
+        """
+        Update a property and return it as stored after the update.
+        Returns None only when no property has this ID. Updates to the name or
+        location return the whole document, ignoring ``projection``.
+        """
+        update = set_update(update_data)
+        before = None
+        if _changes_suggestions(update_data):
+            # The replaced terms are needed to move their suggestion counts,
+            # so read the document as it was and apply the $set to it
+            before = await self.collection.find_one_and_update(
+                {"_id": property_id},
+                update,
+                return_document=ReturnDocument.BEFORE,
+            )
+            doc = {**before, **update["$set"]} if before else None
+        else:
+            doc = await self.collection.find_one_and_update(
+                {"_id": property_id},
+                update,
+                projection=projection,
+                return_document=ReturnDocument.AFTER,
+            )
+        if not doc:
+            return None
+        self.invalidate(property_id)
+        if before:
+            self.count_terms(update_deltas(before, update_data))
+        if _changes_similarity(update_data):
+            await self._reindex_similar([property_id])
+        return model(**doc) if model else doc
+
+    async def update_properties(self, items: List[dict], ordered: bool = False) -> BulkResult:
+        """
+        Apply a batch of ``{id, update}`` patches with a single bulk_write.
+        With ``ordered`` the batch stops at the first invalid item or failing
+        write and later items are reported as not executed.
+        """
+        results = [BulkItemResult(index=index, ok=False) for index in range(len(items))]
+        operations = []
+        positions = []  # request index of each entry in operations
+        changes = []  # update_data of each entry in operations
+        for index, item in enumerate(items):
+            try:
+                patch = BulkPatchItem(**item)
+            except ValidationError as e:
+                results[index].error = str(e)
+            else:
+                results[index].id = patch.id
+                update_data = patch.update.dict(exclude_unset=True)
+                if update_data:
+                    operations.append(UpdateOne({"_id": patch.id}, set_update(update_data)))
+                    positions.append(index)
+                    changes.append(update_data)
+                    continue
+                results[index].error = "No fields to update"
+            if ordered:
+                # Only the items before the rejected one are written
+                for later in results[index + 1:]:
+                    later.error = "Not executed after an earlier error"
+                break
+
+        if not operations:
+            return _bulk_result(results)
+
+        # bulk_write cannot return documents, so read the terms patches replace
+        renamed = [
+            results[index].id for position, index in enumerate(positions)
+            if _changes_suggestions(changes[position])
+        ]
+        previous = {}
+        if renamed:
+            cursor = self.collection.find({"_id": {"$in": renamed}}, SUGGEST_PROJECTION)
+            previous = {doc["_id"]: doc for doc in await cursor.to_list(length=None)}
+
+        write_errors = {}
+        executed = len(operations)
+        try:
+            await self.collection.bulk_write(operations, ordered=ordered)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+            if ordered:
+                executed = min(write_errors) + 1
+
+        # bulk_write only reports totals, so look up which ids exist
+        ids = [results[index].id for index in positions[:executed]]
+        self.invalidate(*ids)
+        cursor = self.collection.find({"_id": {"$in": ids}}, {"_id": 1})
+        found = {doc["_id"] for doc in await cursor.to_list(length=None)}
+        await self._reindex_similar([
+            results[index].id for position, index in enumerate(positions[:executed])
+            if position not in write_errors and results[index].id in found
+            and _changes_similarity(changes[position])
+        ])
+
+        deltas = Counter()
+        for position, index in enumerate(positions):
+            if position >= executed:
+                results[index].error = "Not executed after an earlier error"
+            elif position in write_errors:
+                results[index].error = write_errors[position]
+            elif results[index].id not in found:
+                results[index].error = "Property not found"
+            else:
+                results[index].ok = True
+                before = previous.get(results[index].id)
+                if before is not None:
+                    deltas.update(update_deltas(before, changes[position]))
+                    # A later patch to the same property replaces these terms
+                    previous[results[index].id] = {**before, **changes[position]}
+        self.count_terms(deltas)
+
+        return _bulk_result(results)
+
+    async def increment_counter(
+        self,
+        property_id: str,
+        action: str,
+        amount: int = 1,
+        buffered: bool = False
+    ) -> bool:
+        """
+        Atomically bump an engagement counter with $inc, without reading the document.
+        Cached copies are left alone, so counts can lag by up to the cache TTL.
+        Returns False when no property has this ID. Buffered increments are
+        written by the counter buffer within its flush interval and always
+        return True, since existence is not checked.
+        """
+        if buffered and self.counters.running:
+            self.counters.add(property_id, COUNTER_FIELDS[action], amount)
+            return True
+
+        collection = self.collection.with_options(write_concern=COUNTER_WRITE_CONCERN)
+        result = await collection.update_one(
             {"_id": property_id},
-            {"$set": update_data}
+            {"$inc": {COUNTER_FIELDS[action]: amount}}
         )
-        if result.modified_count:
-            return await self.get_property_by_id(property_id)
-        return None
+        return result.matched_count > 0
+
+    async def add_comment(self, property_id: str, comment: CommentCreate) -> Optional[PropertyComment]:
+        """
+        Store a comment and embed it among the property's most recent comments.
+        Returns None when no property has this ID.
+        """
+        doc = new_comment_document(property_id, comment)
+        # Store the comment before embedding it, so a failed insert cannot
+        # leave an embedded copy that property_comments lacks
+        await self.comments.insert_one(doc)
+        embedded = Comment(**doc).dict()
+        update = push_recent_comments([embedded], self.embedded_comments)
+        update["$set"] = {"updated_at": doc["posted_at"]}
+        result = await self.collection.update_one({"_id": property_id}, update)
+        if not result.matched_count:
+            await self.comments.delete_one({"_id": doc["_id"]})
+            return None
+        self.invalidate(property_id)
+        return PropertyComment(**doc)
+
+    async def get_comments(
+        self,
+        property_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 20
+    ) -> Tuple[List[PropertyComment], Optional[str]]:
+        """Fetch a page of a property's comments, newest first, after the cursor."""
+        query = apply_cursor({"property_id": property_id}, cursor, sort_field="posted_at")
+        find = self.comments.find(query).sort(COMMENT_SORT).limit(limit + 1)
+        documents = await find.to_list(length=None)
+        next_cursor = encode_cursor(documents[limit - 1], sort_field="posted_at") if len(documents) > limit else None
+        return [PropertyComment(**doc) for doc in documents[:limit]], next_cursor
 
     async def delete_property(self, property_id: str) -> bool:
-        """Delete a property."""
-        result = await self.collection.delete_one({"_id": property_id})
-        return result.deleted_count > 0
+        """Delete a property and its comments."""
+        doc = await self.collection.find_one_and_delete(
+            {"_id": property_id}, projection={"name": 1, "location.city": 1, "location.area": 1})
+        self.invalidate(property_id)
+        if not doc:
+            return False
+        self.count_terms(document_deltas([doc], sign=-1))
+        self.unindex_similar(property_id)
+        await self.comments.delete_many({"property_id": property_id})
+        return True
@@ -0,0 +1,246 @@
+"""
+Batch job recomputing ``Property.similar_properties``.
+
+Similar properties used to be whatever the client stored, so scores and
+price differences went stale as soon as prices changed. This job loads each
+city's listings into NumPy feature matrices (budget, price per sqft, area,
+rooms and position), finds every listing's nearest neighbours of the same
+property type with blocked matrix products, and writes the results back with
+unordered bulk_writes:
+
+    python -m mongodb_serve.properties.similar --k 10
+
+Neighbours are searched per (city, property type) group, so time grows with
+the square of the largest group rather than of the whole collection.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+DEFAULT_K = 10
+
+# Numeric features: (document path, log-scaled, weight). Money and areas are
+# log-scaled so that relative rather than absolute differences count.
+NUMERIC_FEATURES: List[Tuple[str, bool, float]] = [
+    ("budget.amount", True, 2.0),
+    ("budget.price_per_sqft", True, 1.0),
+    ("specifications.built_up_area", True, 1.0),
+    ("specifications.plot_size", True, 0.5),
+    ("specifications.bedrooms", False, 1.0),
+    ("specifications.bathrooms", False, 0.5),
+]
+LOCATION_WEIGHT = 1.5
+# Distance between listings that counts as much as one standard deviation
+# of a unit-weight feature
+LOCATION_SCALE_KM = 5.0
+
+# Upper bound on distance matrix cells held at once across workers (float32, ~64 MB)
+_BLOCK_CELLS = 16_000_000
+
+SIMILARITY_PROJECTION = {
+    "name": 1,
+    "property_type": 1,
+    "location.city": 1,
+    "location.coordinates": 1,
+    **{path: 1 for path, _, _ in NUMERIC_FEATURES},
+}
+
+
+def field_value(document: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted path, None when any part is missing."""
+    for key in path.split("."):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(key)
+    return document
+
+
+def _column(documents: List[Dict[str, Any]], path: str) -> np.ndarray:
+    return np.array([field_value(doc, path) for doc in documents], dtype=np.float64)
+
+
+def raw_features(documents: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Unscaled feature rows, NaN where a value is missing: the NUMERIC_FEATURES
+    followed by the position as north/east kilometres.
+    """
+    columns = []
+    for path, log_scaled, _ in NUMERIC_FEATURES:
+        values = _column(documents, path)
+        columns.append(np.log1p(np.clip(values, 0, None)) if log_scaled else values)
+    # Equirectangular projection; accurate over the extent of a city
+    latitude = _column(documents, "location.coordinates.latitude")
+    longitude = _column(documents, "location.coordinates.longitude")
+    columns.append(latitude * 110.57)
+    columns.append(longitude * 111.32 * np.cos(np.radians(latitude)))
+    return np.column_stack(columns)
+
+
+class FeatureScaler:
+    """
+    Fills and scales raw features with statistics fitted on a set of
+    listings, so listings added later are scaled the same way.
+    Numeric features are standardized and weighted; positions are scaled by
+    LOCATION_SCALE_KM so that distances stay isotropic.
+    """
+
+    def __init__(self, raw: np.ndarray):
+        missing = np.isnan(raw)
+        self.medians = np.array([
+            np.median(raw[~missing[:, i], i]) if not missing[:, i].all() else 0.0
+            for i in range(raw.shape[1])
+        ])
+        filled = np.where(missing, self.medians, raw)
+        self.offset = filled.mean(axis=0)
+        std = filled.std(axis=0)
+        weights = np.array([weight for _, _, weight in NUMERIC_FEATURES])
+        numeric = len(NUMERIC_FEATURES)
+        self.scale = np.zeros(raw.shape[1])
+        self.scale[:numeric] = np.divide(weights, std[:numeric], out=np.zeros(numeric), where=std[:numeric] > 0)
+        self.scale[numeric:] = LOCATION_WEIGHT / LOCATION_SCALE_KM
+
+    def transform(self, raw: np.ndarray) -> np.ndarray:
+        filled = np.where(np.isnan(raw), self.medians, raw)
+        return ((filled - self.offset) * self.scale).astype(np.float32)
+
+
+def feature_matrix(documents: List[Dict[str, Any]]) -> np.ndarray:
+    """Weighted, standardized feature rows for one group of listings."""
+    raw = raw_features(documents)
+    return FeatureScaler(raw).transform(raw)
+
+
+def top_k_neighbours(
+    features: np.ndarray,
+    k: int,
+    workers: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and Euclidean distances of each row's ``k`` nearest other rows,
+    nearest first. Rows are processed in blocks, spread over ``workers``
+    threads (NumPy releases the GIL), to bound memory.
+    """
+    n = len(features)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.empty((n, 0), dtype=np.int64), np.empty((n, 0), dtype=np.float32)
+
+    workers = workers or os.cpu_count() or 1
+    squared = np.einsum("ij,ij->i", features, features)
+    block = max(1, _BLOCK_CELLS // (n * workers))
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k), dtype=np.float32)
+
+    def search(start: int) -> None:
+        stop = min(start + block, n)
+        rows = np.arange(stop - start)
+        # |a - b|^2 = |a|^2 + |b|^2 - 2ab; |a|^2 is constant along a row, so
+        # it is only added back to the selected neighbours
+        partial = features[start:stop] @ features.T
+        partial *= -2
+        partial += squared
+        partial[rows, rows + start] = np.inf
+        nearest = np.argpartition(partial, k - 1, axis=1)[:, :k]
+        nearest_partial = np.take_along_axis(partial, nearest, axis=1)
+        order = np.argsort(nearest_partial, axis=1)
+        indices[start:stop] = np.take_along_axis(nearest, order, axis=1)
+        d2 = np.take_along_axis(nearest_partial, order, axis=1) + squared[start:stop, None]
+        distances[start:stop] = np.sqrt(np.maximum(d2, 0))
+
+    starts = range(0, n, block)
+    if workers == 1:
+        for start in starts:
+            search(start)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(search, starts))
+    return indices, distances
+
+
+def similarity_score(distance: float) -> float:
+    """Map a feature distance to a (0, 1] score, 1 for identical listings."""
+    return round(1 / (1 + float(distance)), 4)
+
+
+def similar_property_updates(documents: List[Dict[str, Any]], k: int = DEFAULT_K) -> List[UpdateOne]:
+    """$set similar_properties for every listing of one group, e.g. houses in one city."""
+    if not documents:
+        return []
+    indices, distances = top_k_neighbours(feature_matrix(documents), k)
+    budgets = [field_value(doc, "budget.amount") or 0 for doc in documents]
+    operations = []
+    for i, doc in enumerate(documents):
+        similar = [
+            {
+                "property_id": documents[j]["_id"],
+                "name": documents[j].get("name", ""),
+                "similarity_score": similarity_score(distance),
+                "price_difference": int(budgets[j] - budgets[i]),
+            }
+            for j, distance in zip(indices[i].tolist(), distances[i].tolist())
+        ]
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"similar_properties": similar}}))
+    return operations
+
+
+async def refresh_similar_properties(
+    collection: AsyncIOMotorCollection,
+    k: int = DEFAULT_K,
+    city: Optional[str] = None,
+    batch_size: int = 1000
+) -> Dict[str, Any]:
+    """Recompute similar_properties for every listing, one city at a time."""
+    cities = [city] if city else await collection.distinct("location.city")
+    stats = {"cities": 0, "properties": 0, "modified": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    for name in cities:
+        cursor = collection.find({"location.city": name}, SIMILARITY_PROJECTION).batch_size(10000)
+        documents = await cursor.to_list(length=None)
+        groups = defaultdict(list)
+        for doc in documents:
+            groups[doc.get("property_type")].append(doc)
+        operations = []
+        for group in groups.values():
+            operations += similar_property_updates(group, k)
+        for start in range(0, len(operations), batch_size):
+            result = await collection.bulk_write(operations[start:start + batch_size], ordered=False)
+            stats["modified"] += result.modified_count
+        stats["cities"] += 1
+        stats["properties"] += len(documents)
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from ..client import get_database
+
+    stats = await refresh_similar_properties(get_database().properties, k=args.k, city=args.city)
+    print(f"Cities: {stats['cities']}, properties: {stats['properties']}, "
+          f"updated: {stats['modified']} in {stats['seconds']}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Recompute similar_properties from listing features.")
+    parser.add_argument("--k", type=int, default=DEFAULT_K,
+                        help="similar properties stored per listing")
+    parser.add_argument("--city", help="only recompute listings in this city")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+"""
+In-process autocomplete for cities, areas and property names.
+
+The search box asks for suggestions on every keystroke, so they are served
+from memory instead of MongoDB. SuggestIndex holds every distinct
+``location.city``, ``location.area`` and ``name`` with the number of
+properties using it:
+
+- a sorted list of word-boundary suffixes answers prefix queries by bisection
+  ("hil" finds "Jubilee Hills");
+- a trigram index catches typos ("jubliee" finds "Jubilee Hills").
+
+Typo matching only runs when prefixes alone do not fill the answer. Matches
+are ranked by match quality weighted by popularity, and rankings are memoized.
+On 100k terms a memoized query takes about 10 us. Cold queries take about
+1-1.5 ms at the median and tens of milliseconds for short prefixes shared by
+thousands of terms, so only memoized queries are sub-millisecond (see
+apps/api/benchmarks/suggest_latency.py).
+
+Writes handled by this process move counts from the terms they replace to the
+ones they set; batches apply their changes at once. Terms that other
+processes stopped using disappear when the index is rebuilt from the
+collection.
+"""
+
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+# Suggestion kind -> document field it comes from
+SUGGEST_FIELDS = {"city": "location.city", "area": "location.area", "name": "name"}
+SUGGEST_PROJECTION = {field: 1 for field in SUGGEST_FIELDS.values()}
+
+# Least share of the query's trigrams a fuzzy match must contain
+FUZZY_THRESHOLD = 0.4
+
+# Match quality by kind of match, before popularity weighting
+_PREFIX_QUALITY = 1.0
+_WORD_PREFIX_QUALITY = 0.8
+_FUZZY_QUALITY = 0.6
+
+# Memoized rankings, dropped whenever a term is added or removed
+_MAX_MEMO = 10000
+
+# Above this many new or removed suffixes per batch, rebuilding the sorted
+# suffix list once is cheaper than inserting or deleting each in place
+_BATCH_SUFFIXES = 32
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+Term = Tuple[str, str]  # (kind, text)
+
+
+def normalize(text: str) -> str:
+    """Case-fold and reduce punctuation to single spaces."""
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+def trigrams(text: str, partial: bool = False) -> Set[str]:
+    """
+    Trigrams of each word, padded like pg_trgm. With ``partial`` the last word
+    is treated as still being typed and gets no trailing pad.
+    """
+    words = text.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = "  " + word if partial and i == len(words) - 1 else "  " + word + " "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+def property_terms(document: Dict[str, Any]) -> List[Term]:
+    """Suggestion terms of a property document."""
+    location = document.get("location") or {}
+    values = {"city": location.get("city"), "area": location.get("area"), "name": document.get("name")}
+    return [(kind, value) for kind, value in values.items() if isinstance(value, str) and value.strip()]
+
+
+def document_deltas(documents: Iterable[Dict[str, Any]], sign: int = 1) -> Dict[Term, int]:
+    """Count changes for adding (or with ``sign=-1`` removing) property documents."""
+    deltas: Dict[Term, int] = Counter()
+    for document in documents:
+        for term in property_terms(document):
+            deltas[term] += sign
+    return deltas
+
+
+def update_deltas(before: Dict[str, Any], changes: Dict[str, Any]) -> Dict[Term, int]:
+    """Count changes moving the terms of ``before`` that top-level ``changes`` replace to the new ones."""
+    old = set(property_terms(before))
+    new = set(property_terms({**before, **changes}))
+    return {**{term: -1 for term in old - new}, **{term: 1 for term in new - old}}
+
+
+class SuggestIndex:
+    def __init__(self, fuzzy_threshold: float = FUZZY_THRESHOLD):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._counts: Dict[Term, int] = {}
+        # (word-boundary suffix, 0 for the whole term else 1, term)
+        self._suffixes: List[Tuple[str, int, Term]] = []
+        self._trigrams: Dict[str, Set[Term]] = {}
+        self._memo: Dict[Tuple[str, int], List[Term]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    @staticmethod
+    def _suffix_entries(term: Term) -> List[Tuple[str, int, Term]]:
+        words = normalize(term[1]).split()
+        return [(" ".join(words[i:]), min(i, 1), term) for i in range(len(words))]
+
+    def _index_trigrams(self, term: Term) -> None:
+        for gram in trigrams(normalize(term[1])):
+            self._trigrams.setdefault(gram, set()).add(term)
+
+    def _unindex_trigrams(self, term: Term) -> None:
+        for gram in trigrams(normalize(term[1])):
+            postings = self._trigrams.get(gram)
+            if postings is not None:
+                postings.discard(term)
+                if not postings:
+                    del self._trigrams[gram]
+
+    def add(self, kind: str, text: str, count: int = 1) -> None:
+        """Count ``count`` more properties using a term."""
+        self.apply({(kind, text): count})
+
+    def discard(self, kind: str, text: str, count: int = 1) -> None:
+        """Count ``count`` fewer properties using a term; unused terms are removed."""
+        self.apply({(kind, text): -count})
+
+    def apply(self, deltas: Dict[Term, int]) -> None:
+        """
+        Change the counts of many terms at once; terms left unused are removed.
+        Large batches rebuild the sorted suffix list once instead of inserting
+        or deleting each entry.
+        """
+        added, removed = [], []
+        for term, delta in deltas.items():
+            count = self._counts.get(term, 0) + delta
+            if term in self._counts and count <= 0:
+                del self._counts[term]
+                removed.append(term)
+            elif count > 0:
+                if term not in self._counts:
+                    added.append(term)
+                self._counts[term] = count
+        if not added and not removed:
+            return
+
+        entries = [entry for term in added for entry in self._suffix_entries(term)]
+        if len(entries) + 3 * len(removed) > _BATCH_SUFFIXES:
+            gone = set(removed)
+            suffixes = [entry for entry in self._suffixes if entry[2] not in gone] if gone else self._suffixes
+            # Two sorted runs, which timsort merges in linear time
+            entries.sort()
+            suffixes.extend(entries)
+            suffixes.sort()
+            self._suffixes = suffixes
+        else:
+            for term in removed:
+                for entry in self._suffix_entries(term):
+                    position = bisect_left(self._suffixes, entry)
+                    if position < len(self._suffixes) and self._suffixes[position] == entry:
+                        del self._suffixes[position]
+            for entry in entries:
+                insort(self._suffixes, entry)
+        for term in removed:
+            self._unindex_trigrams(term)
+        for term in added:
+            self._index_trigrams(term)
+        # Count changes only nudge the ranking; memoized answers are kept
+        # unless the set of terms changed
+        self._memo.clear()
+
+    def add_document(self, document: Dict[str, Any]) -> None:
+        self.apply(document_deltas([document]))
+
+    def discard_document(self, document: Dict[str, Any]) -> None:
+        self.apply(document_deltas([document], sign=-1))
+
+    def update_document(self, before: Dict[str, Any], changes: Dict[str, Any]) -> None:
+        """Move counts from the terms of ``before`` that top-level ``changes`` replace to the new ones."""
+        self.apply(update_deltas(before, changes))
+
+    def replace(self, counts: Iterable[Tuple[Term, int]]) -> None:
+        """Rebuild the index from ``((kind, text), count)`` pairs."""
+        self._counts = {}
+        self._trigrams = {}
+        suffixes = []
+        for term, count in counts:
+            self._counts[term] = count
+            suffixes.extend(self._suffix_entries(term))
+            for gram in trigrams(normalize(term[1])):
+                self._trigrams.setdefault(gram, set()).add(term)
+        suffixes.sort()
+        self._suffixes = suffixes
+        self._memo.clear()
+
+    def _prefix_matches(self, query: str) -> Dict[Term, float]:
+        matches: Dict[Term, float] = {}
+        position = bisect_left(self._suffixes, (query,))
+        while position < len(self._suffixes):
+            suffix, inner, term = self._suffixes[position]
+            if not suffix.startswith(query):
+                break
+            quality = _WORD_PREFIX_QUALITY if inner else _PREFIX_QUALITY
+            matches[term] = max(matches.get(term, 0.0), quality)
+            position += 1
+        return matches
+
+    def _fuzzy_matches(self, query: str) -> Dict[Term, float]:
+        grams = sorted(trigrams(query, partial=True), key=lambda gram: len(self._trigrams.get(gram, ())))
+        postings = [self._trigrams.get(gram, set()) for gram in grams]
+        needed = math.ceil(self.fuzzy_threshold * len(grams))
+        # A match shares at least ``needed`` trigrams, so it must contain one
+        # of the len - needed + 1 rarest; only those postings are scanned
+        cut = len(grams) - needed + 1
+        candidates = Counter()
+        for terms in postings[:cut]:
+            candidates.update(terms)
+        # Set intersection walks the smaller side, so the large postings of
+        # common trigrams only cost as much as the candidate set
+        keys = set(candidates)
+        for terms in postings[cut:]:
+            candidates.update(terms & keys)
+        return {
+            term: _FUZZY_QUALITY * common / len(grams)
+            for term, common in candidates.items() if common >= needed
+        }
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Best matching terms for a partially typed query, as
+        ``{"text", "kind", "count"}`` dicts.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        key = (normalized, limit)
+        ranked = self._memo.get(key)
+        if ranked is None:
+            ranked = self._rank(normalized, limit)
+            if len(self._memo) >= _MAX_MEMO:
+                self._memo.clear()
+            self._memo[key] = ranked
+        return [{"text": text, "kind": kind, "count": self._counts.get((kind, text), 0)}
+                for kind, text in ranked]
+
+    def _rank(self, query: str, limit: int) -> List[Term]:
+        matches = self._prefix_matches(query)
+        if len(matches) < limit and len(query) >= 3:
+            for term, quality in self._fuzzy_matches(query).items():
+                matches[term] = max(matches.get(term, 0.0), quality)
+
+        # Popularity reorders terms of similar quality without letting a
+        # common fuzzy match outrank a rare exact prefix by much
+        ranked = sorted(
+            matches,
+            key=lambda term: (-matches[term] * (1 + 0.1 * math.log1p(self._counts[term])), term[1]),
+        )
+        return ranked[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "terms": len(self._counts),
+            "suffixes": len(self._suffixes),
+            "trigrams": len(self._trigrams),
+            "memoized": len(self._memo),
+        }
+
+
+async def load_term_counts(collection: AsyncIOMotorCollection) -> List[Tuple[Term, int]]:
+    """Count the properties using each distinct city, area and name."""
+    counts = []
+    for kind, field in SUGGEST_FIELDS.items():
+        pipeline = [
+            {"$match": {field: {"$type": "string", "$ne": ""}}},
+            {"$group": {"_id": "$" + field, "count": {"$sum": 1}}},
+        ]
+        async for doc in collection.aggregate(pipeline):
+            counts.append(((kind, doc["_id"]), doc["count"]))
+    return counts
@@ -0,0 +1,84 @@
+"""Similar-listing index unit test module."""
+
+import numpy as np
+
+from mongodb_serve.properties.ann import build_similarity_index
+from mongodb_serve.properties.similar import feature_matrix, top_k_neighbours
+
+
+def _catalog(n, seed=3):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "_id": f"p{i}",
+            "name": f"Listing {i}",
+            "property_type": "apartment" if i % 4 else "house",
+            "location": {
+                "city": "Hyderabad" if i % 3 else "Bangalore",
+                "coordinates": {"latitude": 17.4 + rng.normal(0, 0.05), "longitude": 78.4 + rng.normal(0, 0.05)},
+            },
+            "budget": {"amount": int(rng.lognormal(15.5, 0.5))},
+            "specifications": {"built_up_area": int(rng.normal(1500, 300)), "bedrooms": int(rng.integers(1, 5))},
+        }
+        for i in range(n)
+    ]
+
+
+def _ids(similar):
+    return [item["property_id"] for item in similar]
+
+
+def test_similar_excludes_the_listing_and_stays_in_its_group():
+    """Test that results never include the listing itself or other cities and types."""
+    documents = _catalog(400)
+    index = build_similarity_index(documents)
+    groups = {doc["_id"]: (doc["location"]["city"], doc["property_type"]) for doc in documents}
+
+    similar = index.similar("p1", k=10)
+    assert len(similar) == 10
+    assert "p1" not in _ids(similar)
+    assert {groups[property_id] for property_id in _ids(similar)} == {groups["p1"]}
+    scores = [item["similarity_score"] for item in similar]
+    assert scores == sorted(scores, reverse=True)
+    assert index.similar("missing") is None
+
+
+def test_index_follows_inserts_updates_and_deletes():
+    """Test that listings can be added, moved and removed one at a time."""
+    documents = _catalog(200)
+    index = build_similarity_index(documents)
+
+    twin = {**documents[1], "_id": "twin", "name": "Twin"}
+    index.add(twin)
+    assert _ids(index.similar("p1", k=1)) == ["twin"]
+    assert index.similar("p1", k=1)[0]["price_difference"] == 0
+
+    index.add({**twin, "budget": {"amount": twin["budget"]["amount"] * 50}})
+    assert len(index) == 201
+    assert "twin" not in _ids(index.similar("p1", k=3))
+
+    assert index.remove("twin")
+    assert not index.remove("twin")
+    assert "twin" not in index
+    assert len(index) == 200
+
+
+def test_small_groups_are_searched_exhaustively():
+    """Test that a group smaller than k returns all of its other listings."""
+    documents = _catalog(3)
+    index = build_similarity_index([{**doc, "property_type": "villa"} for doc in documents[1:]])
+    assert _ids(index.similar("p1", k=10)) == ["p2"]
+
+
+def test_recall_against_exact_search():
+    """Test that the approximate neighbours mostly match an exact search."""
+    documents = [doc for doc in _catalog(3000) if doc["location"]["city"] == "Hyderabad"
+                 and doc["property_type"] == "apartment"]
+    index = build_similarity_index(documents)
+    exact, _ = top_k_neighbours(feature_matrix(documents), 10, workers=1)
+
+    found = 0
+    for doc, neighbours in zip(documents, exact.tolist()):
+        expected = {documents[j]["_id"] for j in neighbours}
+        found += len(expected & set(_ids(index.similar(doc["_id"], k=10))))
+    assert found / (10 * len(documents)) > 0.85
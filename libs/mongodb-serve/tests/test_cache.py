@@ -0,0 +1,61 @@
+"""Property cache unit test module."""
+
+from mongodb_serve.properties.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the cache stays within maxsize, evicting LRU entries."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """Test that expired entries are treated as misses."""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+
+
+def test_invalidate_removes_entry():
+    """Test that writes can drop a cached entry."""
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_weighted_cache_bounds_total_weight():
+    """Test that weighted entries are evicted to stay under maxsize."""
+    cache = TTLCache(maxsize=5, ttl=60, weigh=len)
+    cache.set("a", [1, 2])
+    cache.set("b", [1, 2, 3])
+    cache.set("c", [1])
+    cache.set("huge", list(range(6)))
+
+    assert cache.get("a") is None
+    assert cache.get("huge") is None
+    assert cache.stats()["weight"] == 4
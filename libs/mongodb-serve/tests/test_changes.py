@@ -0,0 +1,58 @@
+"""Change stream cache invalidation unit test module."""
+
+from types import SimpleNamespace
+
+from mongodb_serve.properties.ann import build_similarity_index
+from mongodb_serve.properties.changes import PropertyChangeWatcher
+from mongodb_serve.properties.service import PropertyService
+
+
+def _watcher():
+    service = PropertyService(SimpleNamespace(properties=None, property_comments=None))
+    service.cache.set("p1", {"_id": "p1"})
+    service.cache.set("p2", {"_id": "p2"})
+    service.query_cache.set("listing", [{"_id": "p1"}])
+    return PropertyChangeWatcher(service, token_collection=None)
+
+
+def test_update_event_invalidates_the_document():
+    """Test that a change to one document drops it and the listings."""
+    watcher = _watcher()
+    assert watcher.apply({"operationType": "update", "documentKey": {"_id": "p1"}})
+
+    service = watcher.service
+    assert service.cache.get("p1") is None
+    assert service.cache.get("p2") == {"_id": "p2"}
+    assert len(service.query_cache) == 0
+
+
+def test_drop_event_clears_everything_and_ends_the_stream():
+    """Test that stream-ending events clear every cache."""
+    watcher = _watcher()
+    assert not watcher.apply({"operationType": "drop"})
+    assert len(watcher.service.cache) == 0
+
+
+def _listing(property_id, amount):
+    return {
+        "_id": property_id,
+        "property_type": "apartment",
+        "location": {"city": "Hyderabad"},
+        "budget": {"amount": amount},
+    }
+
+
+def test_insert_and_update_events_reindex_similar_listings():
+    """Test that looked-up documents are indexed and deletes are removed."""
+    watcher = _watcher()
+    service = watcher.service
+    service.similar_index = build_similarity_index([_listing(f"p{i}", 5000000 + i * 100000) for i in range(10)])
+
+    watcher.apply({"operationType": "insert", "documentKey": {"_id": "p10"}, "fullDocument": _listing("p10", 5100000)})
+    assert "p10" in service.similar_index
+    assert "p10" in [item["property_id"] for item in service.similar_index.similar("p1", k=3)]
+
+    # Deleted before the update lookup ran
+    watcher.apply({"operationType": "update", "documentKey": {"_id": "p2"}, "fullDocument": None})
+    watcher.apply({"operationType": "delete", "documentKey": {"_id": "p2"}})
+    assert "p2" not in service.similar_index
@@ -0,0 +1,184 @@
+"""Property comment storage unit test module."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from mongodb_serve.properties.comments import migrate_embedded_comments
+from mongodb_serve.properties.models import CommentCreate
+from mongodb_serve.properties.service import PropertyService
+
+
+def _matches(document, query):
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(document, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, part) for part in condition):
+                return False
+        elif isinstance(condition, dict) and "$lt" in condition:
+            if not document.get(key) < condition["$lt"]:
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, limit):
+        self.documents = self.documents[:limit]
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class CommentCollection:
+    def __init__(self, log):
+        self.documents = []
+        self.log = log
+
+    async def insert_one(self, document):
+        self.log.append("insert")
+        self.documents.append(document)
+
+    async def delete_one(self, query):
+        self.log.append("delete")
+        self.documents = [doc for doc in self.documents if doc["_id"] != query["_id"]]
+
+    def find(self, query):
+        return FakeCursor([doc for doc in self.documents if _matches(doc, query)])
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted = 0
+        for operation in operations:
+            if not any(_matches(doc, operation._filter) for doc in self.documents):
+                self.documents.append(operation._doc["$setOnInsert"])
+                upserted += 1
+        return SimpleNamespace(upserted_count=upserted)
+
+
+class PropertyCollection:
+    def __init__(self, documents, log):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.log = log
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.log.append("push")
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=int(query["_id"] in self.documents))
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.documents.values() if doc.get("comments")])
+
+
+def _database(properties=()):
+    log = []
+    return SimpleNamespace(
+        properties=PropertyCollection(properties, log),
+        property_comments=CommentCollection(log),
+        log=log,
+    )
+
+
+def _comment(user_id, posted_at):
+    return {
+        "user_id": user_id,
+        "user_name": user_id.title(),
+        "rating": 4,
+        "comment": "Good light",
+        "posted_at": posted_at,
+        "helpful_count": 0,
+        "verified_buyer": False,
+    }
+
+
+def _post(user_id="asha"):
+    return CommentCreate(user_id=user_id, user_name=user_id.title(), rating=5, comment="Lovely view")
+
+
+def test_add_comment_stores_before_embedding():
+    """Test that the comment is inserted before the bounded $push."""
+    database = _database([{"_id": "p1"}])
+    service = PropertyService(database, embedded_comments=3)
+    comment = asyncio.run(service.add_comment("p1", _post()))
+
+    assert database.log == ["insert", "push"]
+    assert database.property_comments.documents[0]["_id"] == comment.id
+    query, update = database.properties.updates[0]
+    assert query == {"_id": "p1"}
+    embedded = update["$push"]["comments"]
+    assert embedded["$sort"] == {"posted_at": -1}
+    assert embedded["$slice"] == 3
+    assert embedded["$each"][0]["comment"] == "Lovely view"
+    assert "property_id" not in embedded["$each"][0]
+    assert update["$set"]["updated_at"] == comment.posted_at
+
+
+def test_add_comment_to_missing_property_leaves_no_comment():
+    """Test that the stored comment is removed when no property matches."""
+    database = _database()
+    assert asyncio.run(PropertyService(database).add_comment("missing", _post())) is None
+    assert database.log == ["insert", "push", "delete"]
+    assert database.property_comments.documents == []
+
+
+def test_comments_are_paged_by_posted_at():
+    """Test that cursor pages are newest first and neither skip nor repeat comments."""
+    database = _database([{"_id": "p1"}])
+    start = datetime(2025, 1, 1)
+    # Two comments per timestamp, so pages split ties on _id
+    database.property_comments.documents = [
+        {**_comment(f"user{i}", start + timedelta(hours=i // 2)), "_id": f"c{i}", "property_id": "p1"}
+        for i in range(7)
+    ] + [{**_comment("other", start), "_id": "c9", "property_id": "p2"}]
+    service = PropertyService(database)
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = asyncio.run(service.get_comments("p1", cursor=cursor, limit=3))
+        seen += [comment.id for comment in page]
+        if cursor is None:
+            break
+    assert seen == ["c6", "c5", "c4", "c3", "c2", "c1", "c0"]
+
+
+def test_migration_copies_comments_once_and_trims_long_lists():
+    """Test that re-running the migration copies nothing twice."""
+    start = datetime(2025, 1, 1)
+    database = _database([
+        {"_id": "p1", "comments": [_comment(f"user{i}", start + timedelta(days=i)) for i in range(4)]},
+        {"_id": "p2", "comments": [_comment("asha", start)]},
+    ])
+
+    stats = asyncio.run(migrate_embedded_comments(database, embedded_limit=2))
+    assert stats == {"properties": 2, "comments": 5, "trimmed": 1}
+    assert {doc["property_id"] for doc in database.property_comments.documents} == {"p1", "p2"}
+    query, update = database.properties.updates[0]
+    assert query == {"_id": "p1"}
+    assert update == {"$push": {"comments": {"$each": [], "$sort": {"posted_at": -1}, "$slice": 2}}}
+
+    again = asyncio.run(migrate_embedded_comments(database, embedded_limit=2))
+    assert again["comments"] == 0
+    assert len(database.property_comments.documents) == 5
@@ -0,0 +1,114 @@
+"""Write-behind counter buffer unit test module."""
+
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError
+
+from mongodb_serve.properties.counters import COUNTER_WRITE_CONCERN, CounterBuffer
+from mongodb_serve.properties.service import PropertyService
+
+
+class FakeCollection:
+    def __init__(self, fail_index=None):
+        self.fail_index = fail_index
+        self.batches = []
+
+    def with_options(self, **options):
+        return self
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append([(op._filter, op._doc) for op in operations])
+        if self.fail_index is not None:
+            raise BulkWriteError({"writeErrors": [{"index": self.fail_index, "errmsg": "failed"}]})
+
+
+class IncrementCollection(FakeCollection):
+    """Records direct $inc updates; only ``existing`` ids match."""
+
+    def __init__(self, existing=()):
+        super().__init__()
+        self.existing = set(existing)
+        self.options = {}
+        self.updates = []
+
+    def with_options(self, **options):
+        self.options = options
+        return self
+
+    async def update_one(self, query, update):
+        self.updates.append((query, update))
+        return SimpleNamespace(matched_count=int(query["_id"] in self.existing))
+
+
+def _service(collection):
+    return PropertyService(SimpleNamespace(properties=collection, property_comments=None))
+
+
+def test_deltas_are_coalesced_per_property():
+    """Test that many increments become one $inc per property."""
+    collection = FakeCollection()
+    buffer = CounterBuffer(collection)
+    for _ in range(3):
+        buffer.add("p1", "views")
+    buffer.add("p1", "likes")
+    buffer.add("p2", "views", 5)
+
+    assert asyncio.run(buffer.flush()) == 2
+    assert collection.batches == [[
+        ({"_id": "p1"}, {"$inc": {"views": 3, "likes": 1}}),
+        ({"_id": "p2"}, {"$inc": {"views": 5}}),
+    ]]
+    assert buffer.stats()["flushed_deltas"] == 9
+    assert buffer.stats()["buffered_deltas"] == 0
+
+
+def test_failed_writes_are_requeued():
+    """Test that only the failed properties are kept for the next flush."""
+    buffer = CounterBuffer(FakeCollection(fail_index=1))
+    buffer.add("p1", "views", 2)
+    buffer.add("p2", "views", 4)
+
+    asyncio.run(buffer.flush())
+
+    stats = buffer.stats()
+    assert (stats["pending_properties"], stats["buffered_deltas"]) == (1, 4)
+    assert (stats["flushed_deltas"], stats["failed_flushes"]) == (2, 1)
+
+
+def test_increments_map_actions_to_counter_fields():
+    """Test that each action is one $inc of its counter field, with the counter write concern."""
+    collection = IncrementCollection(existing={"p1"})
+    service = _service(collection)
+    for action in ("view", "like", "inquiry"):
+        assert asyncio.run(service.increment_counter("p1", action))
+
+    assert collection.updates == [
+        ({"_id": "p1"}, {"$inc": {"views": 1}}),
+        ({"_id": "p1"}, {"$inc": {"likes": 1}}),
+        ({"_id": "p1"}, {"$inc": {"inquiries": 1}}),
+    ]
+    assert collection.options == {"write_concern": COUNTER_WRITE_CONCERN}
+
+
+def test_increment_of_missing_property_is_not_found():
+    """Test that an unmatched $inc returns False, which the route answers with 404."""
+    collection = IncrementCollection()
+    assert not asyncio.run(_service(collection).increment_counter("missing", "like"))
+    assert len(collection.updates) == 1
+
+
+def test_buffered_increments_are_written_by_the_buffer():
+    """Test that buffered bumps skip update_one and are flushed as one $inc."""
+    collection = IncrementCollection()
+    service = _service(collection)
+
+    async def bump():
+        service.counters.start()
+        for _ in range(2):
+            assert await service.increment_counter("p1", "view", buffered=True)
+        await service.counters.stop()
+
+    asyncio.run(bump())
+    assert collection.updates == []
+    assert collection.batches == [[({"_id": "p1"}, {"$inc": {"views": 2}})]]
@@ -0,0 +1,86 @@
+"""Geospatial field unit test module."""
+
+import pytest
+
+from mongodb_serve.properties.geo import (
+    box_polygon,
+    cluster_precision,
+    geo_point,
+    geohash,
+    tile_bounds,
+    with_geo,
+)
+from mongodb_serve.properties.service import set_update
+
+
+def test_geo_point_uses_geojson_order():
+    """Test that GeoJSON points list longitude before latitude."""
+    point = geo_point({"latitude": 17.4326, "longitude": 78.4071})
+    assert point == {"type": "Point", "coordinates": [78.4071, 17.4326]}
+
+
+def test_with_geo_does_not_mutate_location():
+    """Test that the derived point is added to a copy of the location."""
+    location = {"city": "Hyderabad", "coordinates": {"latitude": 17.0, "longitude": 78.0}}
+    derived = with_geo(location)
+    assert derived["geo"]["coordinates"] == [78.0, 17.0]
+    assert derived["geohash"] == geohash(17.0, 78.0)
+    assert "geo" not in location
+
+
+def test_set_update_refreshes_geo_with_location():
+    """Test that replacing the location also replaces its GeoJSON point."""
+    update = set_update({"location": {"city": "Pune", "coordinates": {"latitude": 18.5, "longitude": 73.8}}})
+    assert update["$set"]["location"]["geo"]["coordinates"] == [73.8, 18.5]
+    assert "location" not in set_update({"name": "Villa"})["$set"]
+
+
+def test_box_polygon_is_a_closed_ring():
+    """Test that a viewport becomes a closed, counter-clockwise GeoJSON ring."""
+    polygon = box_polygon(south=17.0, west=78.0, north=18.0, east=79.0)
+    ring = polygon["coordinates"][0]
+    assert polygon["type"] == "Polygon"
+    assert ring[0] == ring[-1] == [78.0, 17.0]
+    assert ring[2] == [79.0, 18.0]
+
+
+def test_box_polygon_rejects_half_globe_spans():
+    """Test that boxes whose edges would wrap the other way round are rejected."""
+    with pytest.raises(ValueError):
+        box_polygon(south=-60.0, west=-170.0, north=70.0, east=170.0)
+    assert box_polygon(south=-60.0, west=-90.0, north=70.0, east=89.0)["type"] == "Polygon"
+
+
+def test_box_polygon_rejects_empty_inverted_and_polar_boxes():
+    """Test that degenerate, inverted and pole-touching viewports are rejected."""
+    boxes = [
+        (18.0, 78.0, 17.0, 79.0),
+        (17.0, 78.0, 17.0, 79.0),
+        (17.0, 79.0, 18.0, 78.0),
+        (17.0, 78.0, 18.0, 78.0),
+        (-90.0, 78.0, 18.0, 79.0),
+        (17.0, 78.0, 90.0, 79.0),
+    ]
+    for south, west, north, east in boxes:
+        with pytest.raises(ValueError):
+            box_polygon(south=south, west=west, north=north, east=east)
+
+
+def test_geohash_matches_reference_value():
+    """Test that geohashes match the standard encoding."""
+    assert geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert geohash(17.4326, 78.4071).startswith(geohash(17.4326, 78.4071, precision=5))
+
+
+def test_cluster_precision_grows_with_zoom():
+    """Test that deeper zoom levels group on longer geohash prefixes."""
+    precisions = [cluster_precision(zoom) for zoom in range(2, 21)]
+    assert precisions == sorted(precisions)
+    assert precisions[0] >= 1 and precisions[-1] <= 9
+
+
+def test_tile_bounds_cover_the_tile():
+    """Test that slippy tile bounds follow the Web Mercator grid."""
+    south, west, north, east = tile_bounds(1, 1, 0)
+    assert (west, east) == (0.0, 180.0)
+    assert south == 0.0 and round(north, 4) == 85.0511
@@ -0,0 +1,112 @@
+"""Property index registry unit test module."""
+
+import asyncio
+
+from mongodb_serve.properties.indexes import (
+    PROPERTY_INDEXES,
+    diff_indexes,
+    ensure_property_indexes,
+    filter_combinations,
+    summarize_plan,
+)
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeCollection:
+    def __init__(self, existing):
+        self.existing = existing
+        self.created = []
+
+    def list_indexes(self):
+        return FakeCursor(self.existing)
+
+    async def create_indexes(self, models):
+        self.created += models
+        return [model.document["name"] for model in models]
+
+
+def _as_listed(model):
+    document = dict(model.document)
+    document["key"] = dict(document["key"])
+    document["v"] = 2
+    return document
+
+
+def test_no_drift_when_all_indexes_exist():
+    """Test that a fully indexed collection reports no drift."""
+    existing = [{"name": "_id_", "key": {"_id": 1}, "v": 2}]
+    existing += [_as_listed(model) for model in PROPERTY_INDEXES]
+    assert not diff_indexes(existing).has_drift
+
+
+def test_drift_reports_missing_unexpected_and_mismatched():
+    """Test that drift is classified per index name."""
+    existing = [_as_listed(model) for model in PROPERTY_INDEXES[1:]]
+    existing[0]["unique"] = True
+    existing.append({"name": "slug_1", "key": {"slug": 1}, "v": 2})
+
+    drift = diff_indexes(existing)
+
+    assert drift.missing == [PROPERTY_INDEXES[0].document["name"]]
+    assert drift.mismatched == [PROPERTY_INDEXES[1].document["name"]]
+    assert drift.unexpected == ["slug_1"]
+
+
+def test_indexes_are_matched_by_key_not_name():
+    """Test that a registered key indexed under another name is neither missing nor unexpected."""
+    existing = [_as_listed(model) for model in PROPERTY_INDEXES]
+    assert existing[0]["name"] == "location.city_1"
+    existing[0]["name"] = "location_city_1"
+    assert not diff_indexes(existing).has_drift
+
+
+def test_ensure_creates_only_unindexed_keys():
+    """Test that indexes present under any name are not created again."""
+    existing = [{"name": "_id_", "key": {"_id": 1}, "v": 2}, {**_as_listed(PROPERTY_INDEXES[0]), "name": "city"}]
+    collection = FakeCollection(existing)
+    created = asyncio.run(ensure_property_indexes(collection))
+    assert collection.created == PROPERTY_INDEXES[1:]
+    assert "location.city_1" not in created
+
+    collection = FakeCollection(existing + [_as_listed(model) for model in PROPERTY_INDEXES[1:]])
+    assert asyncio.run(ensure_property_indexes(collection)) == []
+
+
+def test_text_index_matches_server_listing():
+    """Test that a text index listed in its _fts/_ftsx form is not drift."""
+    text_index = next(model for model in PROPERTY_INDEXES if model.document["name"] == "property_text")
+    listed = {
+        "name": "property_text",
+        "key": {"_fts": "text", "_ftsx": 1},
+        "weights": dict(text_index.document["weights"]),
+        "default_language": "english",
+        "language_override": "language",
+        "textIndexVersion": 3,
+        "v": 2,
+    }
+    assert not diff_indexes([listed], [text_index]).has_drift
+
+    listed["weights"]["name"] = 1
+    assert diff_indexes([listed], [text_index]).mismatched == ["property_text"]
+
+
+def test_filter_combinations_cover_every_subset():
+    """Test that every non-empty filter subset is explained."""
+    assert len(filter_combinations()) == 2 ** 5 - 1
+
+
+def test_summarize_plan_walks_nested_stages():
+    """Test that index names are found in nested winning plans."""
+    explain = {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH",
+        "inputStage": {"stage": "IXSCAN", "indexName": "location.city_1"},
+    }}}
+    plan = summarize_plan(explain)
+    assert plan == {"stages": ["FETCH", "IXSCAN"], "indexes": ["location.city_1"]}
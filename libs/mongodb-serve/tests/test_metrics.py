@@ -0,0 +1,84 @@
+"""MongoDB metrics unit test module."""
+
+from types import SimpleNamespace
+
+from prometheus_client import CollectorRegistry, generate_latest
+
+from mongodb_serve.metrics import (
+    COMMAND_DURATION,
+    COMMAND_FAILURES,
+    REPLY_BYTES,
+    REPLY_DOCUMENTS,
+    CommandMetrics,
+    PoolCollector,
+    batch_size,
+    command_label,
+)
+from mongodb_serve.pool import PoolMetrics
+
+
+def _sample(histogram, command, suffix="_count"):
+    name = histogram._name + suffix
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name == name and sample.labels.get("command") == command:
+                return sample.value
+    return 0.0
+
+
+def _succeeded(command_name, reply, duration_micros=1500):
+    return SimpleNamespace(command_name=command_name, reply=reply, duration_micros=duration_micros)
+
+
+def test_command_labels_are_bounded():
+    """Test that unknown command names share one label value."""
+    assert command_label("find") == "find"
+    assert command_label("saslStart") == "other"
+
+
+def test_batch_size_counts_cursor_documents():
+    """Test that first and later cursor batches are counted and other replies are 0."""
+    assert batch_size({"cursor": {"firstBatch": [{}, {}], "id": 0}}) == 2
+    assert batch_size({"cursor": {"nextBatch": [{}], "id": 0}}) == 1
+    assert batch_size({"n": 1, "ok": 1}) == 0
+
+
+def test_succeeded_commands_record_latency_and_reply_size():
+    """Test that every reply counts documents and sampled replies record their size."""
+    before = {
+        "duration": _sample(COMMAND_DURATION, "aggregate"),
+        "sum": _sample(COMMAND_DURATION, "aggregate", "_sum"),
+        "documents": _sample(REPLY_DOCUMENTS, "aggregate", "_sum"),
+        "bytes": _sample(REPLY_BYTES, "aggregate"),
+    }
+    reply = {"cursor": {"firstBatch": [{"_id": 1}, {"_id": 2}], "id": 0}, "ok": 1}
+    CommandMetrics(reply_sample_rate=1.0).succeeded(_succeeded("aggregate", reply))
+    CommandMetrics(reply_sample_rate=0.0).succeeded(_succeeded("aggregate", reply))
+
+    assert _sample(COMMAND_DURATION, "aggregate") == before["duration"] + 2
+    assert abs(_sample(COMMAND_DURATION, "aggregate", "_sum") - before["sum"] - 0.003) < 1e-9
+    assert _sample(REPLY_DOCUMENTS, "aggregate", "_sum") == before["documents"] + 4
+    assert _sample(REPLY_BYTES, "aggregate") == before["bytes"] + 1
+
+
+def test_failed_commands_are_counted():
+    """Test that failures are timed and counted."""
+    before = COMMAND_FAILURES.labels("delete")._value.get()
+    CommandMetrics().failed(SimpleNamespace(command_name="delete", duration_micros=200, failure={}))
+    assert COMMAND_FAILURES.labels("delete")._value.get() == before + 1
+
+
+def test_pool_collector_exports_pool_gauges():
+    """Test that pool gauges are read from PoolMetrics at scrape time."""
+    pool = PoolMetrics()
+    registry = CollectorRegistry()
+    registry.register(PoolCollector(pool))
+    event = SimpleNamespace(address=("db1", 27017), connection_id=1)
+    pool.connection_created(event)
+    pool.connection_check_out_started(event)
+    pool.connection_checked_out(event)
+
+    text = generate_latest(registry).decode()
+    assert 'mongodb_pool_connections_open{server="db1:27017"} 1.0' in text
+    assert 'mongodb_pool_connections_in_use{server="db1:27017"} 1.0' in text
+    assert "mongodb_pool_checkouts_total 1.0" in text
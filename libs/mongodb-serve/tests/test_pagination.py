@@ -0,0 +1,64 @@
+"""Keyset pagination unit test module."""
+
+import base64
+from datetime import datetime
+
+import pytest
+from bson import ObjectId, json_util
+
+from mongodb_serve.properties.pagination import (
+    InvalidCursorError,
+    apply_cursor,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def test_cursor_round_trip_keeps_types():
+    """Test that the datetime sort key and string id survive encoding."""
+    document = {"_id": str(ObjectId()), "created_at": datetime(2025, 1, 1, 10, 0)}
+    token = encode_cursor(document)
+    assert decode_cursor(token) == (document["created_at"], document["_id"])
+
+
+def test_invalid_cursor_is_rejected():
+    """Test that a tampered cursor raises InvalidCursorError."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def _token(payload):
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+
+
+def test_cursor_values_must_have_the_stored_types():
+    """Test that sort keys other than datetimes or None, and non-string ids, are rejected."""
+    for payload in [
+        {"k": {"$gt": ""}, "id": "abc"},
+        {"k": "2025-01-01", "id": "abc"},
+        {"k": None, "id": {"$ne": None}},
+        {"k": None, "id": ObjectId()},
+        {"k": None, "id": 7},
+    ]:
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(_token(payload))
+    assert decode_cursor(_token({"k": None, "id": "abc"})) == (None, "abc")
+
+
+def test_apply_cursor_adds_range_predicate():
+    """Test that the cursor becomes a range on (created_at, _id)."""
+    created_at = datetime(2025, 1, 1)
+    token = encode_cursor({"_id": "abc", "created_at": created_at})
+    query = apply_cursor({"location.city": "Hyderabad"}, token)
+    assert query == {"$and": [
+        {"location.city": "Hyderabad"},
+        {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": "abc"}},
+        ]},
+    ]}
+
+
+def test_apply_cursor_without_token_is_a_no_op():
+    """Test that the first page uses the plain filter query."""
+    assert apply_cursor({"isVerified": True}, "") == {"isVerified": True}
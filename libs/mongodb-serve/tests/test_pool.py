@@ -0,0 +1,77 @@
+"""Connection pool metrics unit test module."""
+
+import time
+from types import SimpleNamespace
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from mongodb_serve.client import POOL_ENV_OPTIONS, pool_options
+from mongodb_serve.pool import PoolMetrics
+
+PRIMARY = ("db1", 27017)
+SECONDARY = ("db2", 27017)
+
+
+def _event(address=PRIMARY, **fields):
+    return SimpleNamespace(address=address, connection_id=1, **fields)
+
+
+def test_gauges_follow_connection_lifecycle():
+    """Test that open and in-use connections are tracked per server."""
+    metrics = PoolMetrics()
+    for address in (PRIMARY, PRIMARY, SECONDARY):
+        metrics.connection_created(_event(address))
+    for address in (PRIMARY, SECONDARY):
+        metrics.connection_check_out_started(_event(address))
+        metrics.connection_checked_out(_event(address))
+    metrics.connection_checked_in(_event(SECONDARY))
+    metrics.connection_closed(_event(SECONDARY))
+
+    stats = metrics.stats()
+    assert (stats["open"], stats["in_use"], stats["checkouts"]) == (2, 1, 2)
+    assert stats["servers"] == {"db1:27017": {"open": 2, "in_use": 1}, "db2:27017": {"open": 0, "in_use": 0}}
+
+    metrics.pool_closed(_event(PRIMARY))
+    assert (metrics.open, metrics.in_use) == (0, 0)
+
+
+def test_checkout_waits_and_failures_are_recorded():
+    """Test that checkout wait times are measured from the started event."""
+    metrics = PoolMetrics()
+    metrics.connection_check_out_started(_event())
+    time.sleep(0.01)
+    metrics.connection_checked_out(_event())
+    metrics.connection_check_out_started(_event())
+    metrics.connection_check_out_failed(_event(reason="timeout"))
+    metrics.pool_cleared(_event())
+
+    stats = metrics.stats()
+    assert stats["wait_ms_max"] >= 10
+    assert stats["wait_ms_p50"] == stats["wait_ms_max"]
+    assert stats["checkout_failures"] == {"timeout": 1}
+    assert stats["pool_clears"] == 1
+    assert stats["in_use"] == 1
+
+
+def test_pool_options_come_from_the_environment(monkeypatch):
+    """Test that only the pool settings set in the environment are passed to the client."""
+    for variable in POOL_ENV_OPTIONS:
+        monkeypatch.delenv(variable, raising=False)
+    assert pool_options() == {}
+
+    monkeypatch.setenv("MONGODB_MAX_POOL_SIZE", "50")
+    monkeypatch.setenv("MONGODB_COMPRESSORS", "zstd,zlib")
+    monkeypatch.setenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "0")
+    monkeypatch.setenv("MONGODB_MIN_POOL_SIZE", "")
+    assert pool_options() == {"maxPoolSize": 50, "compressors": "zstd,zlib"}
+
+
+def test_unset_pool_options_keep_the_connection_string(monkeypatch):
+    """Test that pool settings in MONGODB_URI are not overridden by defaults."""
+    for variable in POOL_ENV_OPTIONS:
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setenv("MONGODB_MAX_POOL_SIZE", "50")
+    client = AsyncIOMotorClient("mongodb://localhost/?minPoolSize=3&maxPoolSize=20", connect=False, **pool_options())
+    assert client.options.pool_options.min_pool_size == 3
+    assert client.options.pool_options.max_pool_size == 50
+    client.close()
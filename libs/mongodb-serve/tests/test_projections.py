@@ -0,0 +1,38 @@
+"""Listing projection unit test module."""
+
+import pytest
+
+from mongodb_serve.properties.projections import (
+    SUMMARY_PROJECTION,
+    UnknownFieldError,
+    sparse_projection,
+)
+
+
+def test_summary_projection_excludes_heavy_fields():
+    """Test that the summary projection leaves embedded lists on the server."""
+    for heavy in ("comments", "verification", "videos", "meta", "similar_properties"):
+        assert heavy not in SUMMARY_PROJECTION
+    assert SUMMARY_PROJECTION["images"] == {"$elemMatch": {"is_primary": True}}
+
+
+def test_sparse_projection_accepts_nested_paths():
+    """Test that a sparse fieldset becomes an inclusion projection."""
+    projection = sparse_projection(["name", " location.city", "isVerified", ""])
+    assert projection == {"_id": 1, "name": 1, "location.city": 1, "isVerified": 1}
+
+
+def test_sparse_projection_rejects_unknown_fields():
+    """Test that unknown fields are rejected instead of silently ignored."""
+    with pytest.raises(UnknownFieldError):
+        sparse_projection(["name", "password"])
+
+
+def test_sparse_projection_rejects_overlapping_paths():
+    """Test that a field and a path inside it are rejected in either order."""
+    with pytest.raises(UnknownFieldError):
+        sparse_projection(["location", "location.city"])
+    with pytest.raises(UnknownFieldError):
+        sparse_projection(["location.city", "location"])
+    assert sparse_projection(["location.city", "location.area", "name", "name"]) == {
+        "_id": 1, "location.city": 1, "location.area": 1, "name": 1}
@@ -0,0 +1,45 @@
+"""Trusted read serialization unit test module."""
+
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from mongodb_serve.properties.models import PropertySummary
+from mongodb_serve.properties.serialization import apply_defaults, dumps, strip_internal
+
+
+def test_apply_defaults_fills_missing_top_level_fields():
+    """Test that model defaults are added without overriding stored values."""
+    document = apply_defaults({"name": "Villa", "likes": 3})
+    assert document["likes"] == 3
+    assert document["views"] == 0
+    assert document["comments"] == []
+
+
+def test_apply_defaults_drops_internal_location_fields():
+    """Test that the stored geohash is not returned, like on the validated path."""
+    location = {"city": "Hyderabad", "geo": {"type": "Point", "coordinates": [78.4, 17.4]}, "geohash": "tepg0jw23"}
+    document = apply_defaults({"name": "Villa", "location": location})
+    assert document["location"] == {"city": "Hyderabad", "geo": location["geo"]}
+    assert "geohash" in location
+
+
+def test_sparse_documents_drop_internal_location_fields():
+    """Test that a raw sparse fieldset including location does not leak the geohash."""
+    document = {"_id": "p1", "location": {"city": "Pune", "geohash": "tek3"}}
+    assert strip_internal(document) == {"_id": "p1", "location": {"city": "Pune"}}
+    assert document["location"]["geohash"] == "tek3"
+    assert strip_internal({"_id": "p1", "name": "Villa"}) == {"_id": "p1", "name": "Villa"}
+
+
+def test_apply_defaults_uses_the_given_model():
+    """Test that summary documents only get summary defaults."""
+    assert "views" not in apply_defaults({"name": "Villa"}, PropertySummary)
+
+
+def test_dumps_encodes_bson_types():
+    """Test that ObjectId and datetime values are encoded."""
+    object_id = ObjectId()
+    encoded = dumps({"_id": object_id, "created_at": datetime(2025, 1, 1, 10, 0)})
+    assert json.loads(encoded) == {"_id": str(object_id), "created_at": "2025-01-01T10:00:00"}
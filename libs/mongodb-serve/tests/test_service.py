@@ -0,0 +1,648 @@
+"""Property service helper unit test module."""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from mongodb_serve.properties.models import Property
+from mongodb_serve.properties.pagination import decode_cursor
+from mongodb_serve.properties.projections import SUMMARY_PROJECTION
+from mongodb_serve.properties.service import (
+    BUDGET_BANDS,
+    PropertyService,
+    cluster_pipeline,
+    facet_counts,
+    facet_pipeline,
+    query_cache_key,
+)
+from mongodb_serve.properties.suggest import document_deltas
+
+
+def property_payload(name="Lake View Villa", **fields):
+    """Smallest valid PropertyCreate body; defaulted fields are left out."""
+    return {
+        "name": name,
+        "property_type": "House",
+        "age": 2,
+        "location": {
+            "city": "Hyderabad", "area": "Gachibowli", "address": "Road 1", "pincode": "500032",
+            "state": "Telangana", "country": "India", "coordinates": {"latitude": 17.44, "longitude": 78.35},
+        },
+        "budget": {"amount": 12500000, "negotiable": True},
+        "specifications": {"bedrooms": 3},
+        "owner": {"type": "Owner", "name": "A. Rao", "contact": {"phone": "999", "email": "a@example.com"}},
+        "slug": name.lower().replace(" ", "-"),
+        "meta": {"title": name, "description": "", "keywords": []},
+        **fields,
+    }
+
+
+class FakeCollection:
+    def __init__(self, documents=None):
+        self.documents = documents or [{"_id": "p1"}, {"_id": "p2"}]
+        self.calls = []
+        self.cursors = []
+
+    async def estimated_document_count(self):
+        self.calls.append("estimated")
+        return 1000
+
+    async def count_documents(self, query):
+        self.calls.append(query)
+        return 42
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append(documents)
+        failing = [i for i, doc in enumerate(documents) if doc["name"].startswith("Duplicate")]
+        if failing:
+            raise BulkWriteError({"writeErrors": [{"index": i, "errmsg": "duplicate key"} for i in failing]})
+
+    def find(self, query, projection=None):
+        self.calls.append(query)
+        self.cursors.append(FakeCursor([dict(doc) for doc in self.documents], projection))
+        return self.cursors[-1]
+
+    def aggregate(self, pipeline):
+        self.calls.append(pipeline)
+        facets = {name: [] for name in ("city", "property_type", "furnished", "bedrooms", "budget")}
+        return FakeCursor([{**facets, "total": [{"count": len(self.documents)}]}])
+
+
+class FakeCursor:
+    def __init__(self, documents, projection=None):
+        self.documents = documents
+        self.projection = projection
+        self.sorted_by = None
+        self.limited_to = None
+
+    def sort(self, keys):
+        self.sorted_by = keys
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        self.limited_to = count
+        self.documents = self.documents[:count]
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return self.documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class PatchCollection:
+    """Holds ``existing`` ids; updates to ids in ``failing`` raise write errors."""
+
+    def __init__(self, existing, failing=()):
+        self.documents = {id: {"_id": id, "name": f"Listing {id}"} for id in existing}
+        self.failing = set(failing)
+        self.written = []
+        self.reads = []
+
+    async def bulk_write(self, operations, ordered=True):
+        errors = []
+        for position, operation in enumerate(operations):
+            property_id = operation._filter["_id"]
+            if property_id in self.failing:
+                errors.append({"index": position, "errmsg": "write failed"})
+                if ordered:
+                    break
+            else:
+                self.written.append(property_id)
+                if property_id in self.documents:
+                    self.documents[property_id].update(operation._doc["$set"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=ReturnDocument.BEFORE):
+        before = self.documents.get(query["_id"])
+        if before is None:
+            return None
+        after = {**before, **update["$set"]}
+        self.documents[query["_id"]] = after
+        result = before if return_document is ReturnDocument.BEFORE else after
+        if projection:
+            result = {key: value for key, value in result.items() if key == "_id" or projection.get(key)}
+        return dict(result)
+
+    async def find_one(self, query):
+        self.reads.append(query["_id"])
+        doc = self.documents.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_delete(self, query, projection=None):
+        return self.documents.pop(query["_id"], None)
+
+    async def delete_many(self, query):
+        pass
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(self.documents[id]) for id in query["_id"]["$in"] if id in self.documents])
+
+
+def _patch_service(collection):
+    # Comments are only deleted alongside their property, so the fake doubles as both
+    return PropertyService(SimpleNamespace(properties=collection, property_comments=collection))
+
+
+def _patch(property_id, **update):
+    return {"id": property_id, "update": update or {"featured": True}}
+
+
+def _outcomes(result):
+    return [item.error or "ok" for item in result.results]
+
+
+def test_unordered_patches_report_each_item():
+    """Test that invalid, failing and unknown items are reported at their request index."""
+    collection = PatchCollection(existing={"p1", "p2", "p4"}, failing={"p2"})
+    items = [_patch("p1"), {"update": {}}, _patch("p2"), _patch("p3"), {"id": "p4", "update": {}}, _patch("p4")]
+    result = asyncio.run(_patch_service(collection).update_properties(items))
+
+    outcomes = _outcomes(result)
+    assert outcomes[0] == "ok"
+    assert "validation error" in outcomes[1]
+    assert outcomes[2:] == ["write failed", "Property not found", "No fields to update", "ok"]
+    assert collection.written == ["p1", "p3", "p4"]
+
+
+def test_ordered_patches_stop_at_the_first_invalid_item():
+    """Test that nothing after a rejected item is written in ordered mode."""
+    collection = PatchCollection(existing={"p1", "p2", "p3"})
+    items = [_patch("p1"), {"id": "p2", "update": {}}, _patch("p3")]
+    result = asyncio.run(_patch_service(collection).update_properties(items, ordered=True))
+
+    assert _outcomes(result) == ["ok", "No fields to update", "Not executed after an earlier error"]
+    assert collection.written == ["p1"]
+
+
+def test_ordered_patches_stop_at_the_first_failing_write():
+    """Test that positions after a failed write are reported as not executed."""
+    collection = PatchCollection(existing={"p1", "p2", "p3"}, failing={"p2"})
+    items = [_patch("p1"), _patch("p2"), _patch("p3")]
+    result = asyncio.run(_patch_service(collection).update_properties(items, ordered=True))
+
+    assert _outcomes(result) == ["ok", "write failed", "Not executed after an earlier error"]
+    assert collection.written == ["p1"]
+
+
+def test_update_returns_the_projected_post_image():
+    """Test that a patch not touching suggestion terms returns the updated document in the projection."""
+    collection = PatchCollection(existing={"p1"})
+    doc = asyncio.run(_patch_service(collection).update_property(
+        "p1", {"featured": True, "is_verified": True}, projection={"featured": 1}, model=None))
+    assert doc == {"_id": "p1", "featured": True}
+    assert collection.documents["p1"]["is_verified"] is True
+
+
+def test_repeated_update_still_returns_the_document():
+    """Test that a patch which changes nothing returns the document rather than None."""
+    service = _patch_service(PatchCollection(existing={"p1"}))
+    for _ in range(2):
+        doc = asyncio.run(service.update_property("p1", {"featured": True}, model=None))
+        assert doc["_id"] == "p1" and doc["name"] == "Listing p1" and doc["featured"] is True
+
+
+def test_update_of_unknown_property_keeps_caches():
+    """Test that updating a missing id returns None without invalidating anything."""
+    service = _patch_service(PatchCollection(existing={"p1"}))
+    service.cache.set("p1", {"_id": "p1"})
+    service.query_cache.set("listing", [{"_id": "p1"}])
+    service.count_cache.set("count", 1)
+
+    assert asyncio.run(service.update_property("missing", {"featured": True})) is None
+    assert service.cache.get("p1") == {"_id": "p1"}
+    assert service.query_cache.get("listing") == [{"_id": "p1"}]
+    assert service.count_cache.get("count") == 1
+
+
+def test_property_reads_are_cached_until_a_write():
+    """Test that cache hits skip the collection and updates and deletes invalidate."""
+    collection = PatchCollection(existing={"p1"})
+    service = _patch_service(collection)
+    for _ in range(2):
+        assert asyncio.run(service.get_property_by_id("p1", model=None))["name"] == "Listing p1"
+    assert collection.reads == ["p1"]
+
+    asyncio.run(service.update_property("p1", {"name": "Renamed"}, model=None))
+    assert asyncio.run(service.get_property_by_id("p1", model=None))["name"] == "Renamed"
+    assert collection.reads == ["p1", "p1"]
+
+    assert asyncio.run(service.delete_property("p1"))
+    assert asyncio.run(service.get_property_by_id("p1", model=None)) is None
+
+
+class RacingCollection(PatchCollection):
+    """Runs a write against the service while a find_one is in flight."""
+
+    def __init__(self, existing):
+        super().__init__(existing)
+        self.service = None
+
+    async def find_one(self, query):
+        doc = await super().find_one(query)
+        await self.service.update_property(query["_id"], {"featured": True}, model=None)
+        return doc
+
+
+def test_reads_overlapping_a_write_are_not_cached():
+    """Test that a document read before a concurrent write's invalidation is not cached."""
+    collection = RacingCollection(existing={"p1"})
+    service = collection.service = _patch_service(collection)
+    assert "featured" not in asyncio.run(service.get_property_by_id("p1", model=None))
+    assert service.cache.get("p1") is None
+
+
+def _listing(property_id, amount):
+    return {
+        "_id": property_id,
+        "name": f"Listing {property_id}",
+        "property_type": "apartment",
+        "location": {"city": "Hyderabad", "coordinates": {"latitude": 17.4, "longitude": 78.4}},
+        "budget": {"amount": amount},
+        "specifications": {"built_up_area": 1200, "bedrooms": 2},
+    }
+
+
+class CatalogCollection:
+    """Serves ``documents``; ``during_scan`` runs once the full scan has been read."""
+
+    def __init__(self, documents):
+        self.documents = {doc["_id"]: doc for doc in documents}
+        self.during_scan = None
+
+    def find(self, query, projection=None):
+        if "_id" in query:
+            return FakeCursor([self.documents[id] for id in query["_id"]["$in"] if id in self.documents])
+        cursor = FakeCursor(list(self.documents.values()))
+        if self.during_scan:
+            self.during_scan()
+            self.during_scan = None
+        return cursor
+
+
+def test_rebuild_replays_writes_made_while_building():
+    """Test that listings written during a rebuild are applied to the new index."""
+    collection = CatalogCollection([_listing(f"p{i}", 5000000 + i * 100000) for i in range(20)])
+    service = _patch_service(collection)
+    asyncio.run(service.refresh_similarity_index())
+
+    def concurrent_writes():
+        collection.documents["p20"] = _listing("p20", 5500000)
+        service.index_similar([collection.documents["p20"]])
+        del collection.documents["p3"]
+        service.unindex_similar("p3")
+
+    collection.during_scan = concurrent_writes
+    assert asyncio.run(service.refresh_similarity_index()) == 20
+    assert "p20" in service.similar_index
+    assert "p3" not in service.similar_index
+
+
+def _suggestion_counts(service):
+    return {term: count for term, count in service.suggestions._counts.items() if term[0] == "name"}
+
+
+def test_updates_move_suggestion_counts_to_new_names():
+    """Test that renames replace the old term and unchanged names are not counted again."""
+    collection = PatchCollection(existing={"p1", "p2"})
+    service = _patch_service(collection)
+    service.suggestions.add("name", "Listing p1")
+    service.suggestions.add("name", "Listing p2")
+
+    updated = asyncio.run(service.update_property("p1", {"name": "Lake House"}, model=None))
+    assert updated["name"] == "Lake House"
+    asyncio.run(service.update_property("p2", {"name": "Listing p2"}, model=None))
+    asyncio.run(service.update_property("p2", {"featured": True}, model=None))
+    assert _suggestion_counts(service) == {("name", "Lake House"): 1, ("name", "Listing p2"): 1}
+
+    items = [_patch("p2", name="Hill View"), _patch("p2", name="Hill Crest"), _patch("p1", name="Ghost")]
+    collection.failing = {"p1"}
+    asyncio.run(service.update_properties(items))
+    assert _suggestion_counts(service) == {("name", "Lake House"): 1, ("name", "Hill Crest"): 1}
+
+
+class TermCollection:
+    """Serves suggestion term counts; ``during_load`` runs while they are read."""
+
+    def __init__(self, names):
+        self.names = names
+        self.during_load = None
+
+    def aggregate(self, pipeline):
+        return self._groups(pipeline[1]["$group"]["_id"])
+
+    async def _groups(self, field):
+        if self.during_load:
+            self.during_load()
+            self.during_load = None
+        if field == "$name":
+            for name in self.names:
+                yield {"_id": name, "count": 1}
+
+
+def test_suggestion_rebuild_replays_writes_made_while_loading():
+    """Test that term counts changed during a rebuild are applied to the new index."""
+    collection = TermCollection(["Lake View", "Hill Top"])
+    service = _patch_service(collection)
+
+    def concurrent_writes():
+        service.count_terms(document_deltas([{"name": "Sea Breeze"}]))
+        service.count_terms(document_deltas([{"name": "Hill Top"}], sign=-1))
+
+    collection.during_load = concurrent_writes
+    assert asyncio.run(service.refresh_suggestions()) == 2
+    assert _suggestion_counts(service) == {("name", "Lake View"): 1, ("name", "Sea Breeze"): 1}
+    assert service._suggest_written is None
+
+
+def test_facet_pipeline_matches_before_faceting():
+    """Test that filters run once, ahead of every facet."""
+    pipeline = facet_pipeline({"location.city": "Hyderabad"})
+    assert pipeline[0] == {"$match": {"location.city": "Hyderabad"}}
+    assert set(pipeline[1]["$facet"]) == {"total", "city", "property_type", "furnished", "bedrooms", "budget"}
+
+
+def test_facet_counts_reshape_facet_output():
+    """Test that missing values are dropped and budget bands get bounds."""
+    result = {
+        "total": [{"count": 12}],
+        "city": [{"_id": "Hyderabad", "count": 9}, {"_id": "Pune", "count": 3}],
+        "property_type": [{"_id": "House", "count": 12}],
+        "furnished": [{"_id": None, "count": 4}, {"_id": "Furnished", "count": 8}],
+        "bedrooms": [{"_id": 3, "count": 12}],
+        "budget": [{"_id": BUDGET_BANDS[0], "count": 2}, {"_id": "open", "count": 10}],
+    }
+    facets = facet_counts(result)
+    assert facets["total"] == 12
+    assert facets["furnished"] == [{"value": "Furnished", "count": 8}]
+    assert facets["budget"] == [
+        {"min": BUDGET_BANDS[0], "max": BUDGET_BANDS[1], "count": 2},
+        {"min": BUDGET_BANDS[-1], "max": None, "count": 10},
+    ]
+
+
+def test_facet_counts_handle_no_matches():
+    """Test that an empty result has a zero total."""
+    empty = {name: [] for name in ("total", "city", "property_type", "furnished", "bedrooms", "budget")}
+    assert facet_counts(empty)["total"] == 0
+
+
+def _count_service(documents=None):
+    collection = FakeCollection(documents)
+    return PropertyService(SimpleNamespace(properties=collection, property_comments=None)), collection
+
+
+def test_approximate_counts_use_metadata_when_unfiltered():
+    """Test that an unfiltered approximate total skips count_documents."""
+    service, collection = _count_service()
+    assert asyncio.run(service.count_properties()) == 1000
+    assert asyncio.run(service.count_properties(exact=True)) == 42
+    assert collection.calls == ["estimated", {}]
+
+
+def test_filtered_counts_are_cached_until_a_write():
+    """Test that approximate totals are cached per filter and cleared by writes."""
+    service, collection = _count_service()
+    for _ in range(2):
+        assert asyncio.run(service.count_properties(property_type="House", city="Pune")) == 42
+    assert len(collection.calls) == 1
+
+    asyncio.run(service.count_properties(city="Pune", property_type="House", exact=True))
+    assert len(collection.calls) == 2
+
+    service.invalidate("p1")
+    asyncio.run(service.count_properties(city="Pune", property_type="House"))
+    assert collection.calls[-1] == {"location.city": "Pune", "property_type": "House"}
+    assert len(collection.calls) == 3
+
+
+def test_logically_identical_queries_share_a_cache_entry():
+    """Test that filter key order does not split cached listings."""
+    service, collection = _count_service()
+    assert query_cache_key({"city": "Pune", "type": "House"}) == query_cache_key({"type": "House", "city": "Pune"})
+    first = asyncio.run(service._find_cached({"a": 1, "b": {"$gte": 2, "$lte": 3}}, {"name": 1}, limit=5))
+    again = asyncio.run(service._find_cached({"b": {"$lte": 3, "$gte": 2}, "a": 1}, {"name": 1}, limit=5))
+    assert again is first
+    assert len(collection.calls) == 1
+    asyncio.run(service._find_cached({"a": 1, "b": {"$gte": 2, "$lte": 3}}, {"name": 1}, limit=6))
+    assert len(collection.calls) == 2
+
+
+def test_listings_and_facets_are_cached_until_a_write():
+    """Test that repeated listing and facet queries are served from the cache and any write clears it."""
+    service, collection = _count_service()
+
+    def read():
+        listing = asyncio.run(service.get_properties_by_filters(city="Pune", model=None))
+        facets = asyncio.run(service.get_property_facets(city="Pune"))
+        return listing, facets
+
+    listing, facets = read()
+    assert [doc["_id"] for doc in listing] == ["p1", "p2"]
+    assert facets["total"] == 2
+    read()
+    assert len(collection.calls) == 2
+
+    asyncio.run(service.create_properties([property_payload()]))
+    calls = len(collection.calls)
+    read()
+    assert len(collection.calls) == calls + 2
+
+
+def test_listing_cache_is_bounded_by_documents_held():
+    """Test that query_cache_size limits the documents cached, not the number of queries."""
+    collection = FakeCollection()
+    service = PropertyService(SimpleNamespace(properties=collection, property_comments=None), query_cache_size=5)
+    # Each two-document listing weighs three, so a second one evicts the first
+    for city in ("Pune", "Goa", "Pune"):
+        asyncio.run(service.get_properties_by_filters(city=city, model=None))
+    assert len(collection.calls) == 3
+    assert service.query_cache.stats()["weight"] == 3
+
+
+def test_search_combines_text_with_filters_and_sorts_by_score():
+    """Test that full-text search filters, projects and sorts on the text score."""
+    service, collection = _count_service([{"_id": f"p{i}", "score": 3.0 - i} for i in range(3)])
+    documents = asyncio.run(service.search_properties(
+        "lake view", city="Pune", is_verified=True, skip=1, limit=1, projection=SUMMARY_PROJECTION))
+
+    text_score = {"$meta": "textScore"}
+    assert collection.calls[-1] == {"$text": {"$search": "lake view"}, "location.city": "Pune", "isVerified": True}
+    cursor = collection.cursors[-1]
+    assert cursor.projection == {**SUMMARY_PROJECTION, "score": text_score}
+    assert cursor.sorted_by[0] == ("score", text_score)
+    assert cursor.limited_to == 1
+    assert documents == [{"_id": "p1", "score": 2.0}]
+
+
+def test_nearby_filters_run_inside_geo_near():
+    """Test that $geoNear gets the point, radius in metres and listing filters, and distances come back in km."""
+    service, collection = _count_service()
+    asyncio.run(service.get_properties_near(
+        17.44, 78.35, radius_km=2.5, property_type="Flat", min_budget=1000000, limit=10, projection={"name": 1}))
+
+    geo_near, limit, project = collection.calls[-1]
+    stage = geo_near["$geoNear"]
+    assert stage["near"] == {"type": "Point", "coordinates": [78.35, 17.44]}
+    assert stage["key"] == "location.geo"
+    assert stage["maxDistance"] == 2500
+    assert stage["query"] == {"property_type": "Flat", "budget.amount": {"$gte": 1000000}}
+    assert stage["distanceField"] == "distance_km"
+    assert stage["distanceMultiplier"] == 0.001
+    assert limit == {"$limit": 10}
+    assert project == {"$project": {"name": 1, "distance_km": 1}}
+
+
+class ClusterCollection:
+    """Records aggregations; with ``legacy`` it rejects $median like MongoDB before 7.0."""
+
+    def __init__(self, legacy=False):
+        self.legacy = legacy
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        if self.legacy and "$median" in str(pipeline):
+            raise OperationFailure("unknown group operator '$median'", code=15952)
+        return FakeCursor([{"geohash": "tepg", "count": 2}])
+
+
+def _cluster_service(legacy=False):
+    collection = ClusterCollection(legacy)
+    return PropertyService(SimpleNamespace(properties=collection, property_comments=None)), collection
+
+
+def test_cluster_pipeline_groups_by_geohash_prefix():
+    """Test that clusters group on the zoom's geohash prefix within the tile."""
+    service, collection = _cluster_service()
+    clusters = asyncio.run(service.get_property_clusters(12, 2925, 1870, property_type="Flat"))
+    assert clusters == [{"geohash": "tepg", "count": 2}]
+
+    match, group, sort, project = collection.pipelines[-1]
+    assert match["$match"]["property_type"] == "Flat"
+    assert match["$match"]["location.geo"]["$geoWithin"]["$geometry"]["type"] == "Polygon"
+    assert group["$group"]["_id"] == {"$substrBytes": ["$location.geohash", 0, 6]}
+    assert group["$group"]["median_price"]["$median"]["input"] == "$budget.amount"
+    assert sort == {"$sort": {"_id": 1}}
+    assert project["$project"]["geohash"] == "$_id"
+    assert cluster_pipeline({}, 6, median=False)[1]["$group"]["median_price"] == {"$avg": "$budget.amount"}
+
+
+def test_clusters_are_cached_per_tile_and_filters():
+    """Test that clusters are cached by tile and filters and survive writes until they expire."""
+    service, collection = _cluster_service()
+    asyncio.run(service.get_property_clusters(12, 2925, 1870, property_type="Flat", is_verified=True))
+    asyncio.run(service.get_property_clusters(12, 2925, 1870, is_verified=True, property_type="Flat"))
+    assert len(collection.pipelines) == 1
+
+    asyncio.run(service.get_property_clusters(12, 2925, 1871, property_type="Flat", is_verified=True))
+    asyncio.run(service.get_property_clusters(12, 2925, 1870, property_type="House", is_verified=True))
+    assert len(collection.pipelines) == 3
+
+    service.invalidate("p1")
+    asyncio.run(service.get_property_clusters(12, 2925, 1870, property_type="Flat", is_verified=True))
+    assert len(collection.pipelines) == 3
+
+
+def test_clusters_fall_back_to_mean_price_without_median():
+    """Test that servers without $median get the mean price, and are not asked for $median again."""
+    service, collection = _cluster_service(legacy=True)
+    assert asyncio.run(service.get_property_clusters(12, 2925, 1870)) == [{"geohash": "tepg", "count": 2}]
+    asyncio.run(service.get_property_clusters(12, 2925, 1871))
+    medians = [pipeline[1]["$group"]["median_price"] for pipeline in collection.pipelines]
+    assert [next(iter(median)) for median in medians] == ["$median", "$avg", "$avg"]
+
+
+def test_pages_read_one_extra_document_for_the_next_cursor():
+    """Test that next_cursor points at the last returned document only when more remain."""
+    stored = [{"_id": f"p{i}", "created_at": datetime(2025, 1, 10 - i)} for i in range(4)]
+    service, collection = _count_service(stored)
+    items, next_cursor = asyncio.run(service.get_properties_page(limit=3, projection={"name": 1}, model=None))
+    assert [doc["_id"] for doc in items] == ["p0", "p1", "p2"]
+    assert decode_cursor(next_cursor) == (datetime(2025, 1, 8), "p2")
+    assert collection.cursors[-1].limited_to == 4
+    assert collection.cursors[-1].projection == {"name": 1, "created_at": 1}
+
+    # A last page that is exactly full has no next page
+    collection.documents = stored[3:]
+    items, next_cursor = asyncio.run(service.get_properties_page(cursor=next_cursor, limit=1, model=None))
+    assert [doc["_id"] for doc in items] == ["p3"]
+    assert next_cursor is None
+
+
+def test_watermark_exports_follow_updated_at():
+    """Test that exports are in _id order unless a watermark is given."""
+    service, collection = _count_service()
+
+    async def export(**filters):
+        return [doc["_id"] async for doc in service.iter_properties(**filters)]
+
+    assert asyncio.run(export()) == ["p1", "p2"]
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    asyncio.run(export(updated_since=since))
+
+    assert collection.cursors[0].sorted_by == [("_id", 1)]
+    assert collection.cursors[1].sorted_by == [("updated_at", 1), ("_id", 1)]
+    assert collection.calls[-1] == {"updated_at": {"$gte": since}}
+
+
+def test_created_documents_store_defaults_and_validate():
+    """Test that a stored document carries every default and round-trips through Property."""
+    service, collection = _count_service()
+    result = asyncio.run(service.create_properties([property_payload()]))
+    assert result.succeeded == 1
+
+    doc = collection.calls[0][0]
+    assert (doc["isVerified"], doc["status"], doc["featured"]) == (False, "Active", False)
+    assert doc["budget"]["currency"] == "INR"
+    assert doc["_id"] == result.results[0].id
+    assert Property(**doc).id == doc["_id"]
+
+
+def test_bulk_create_maps_errors_to_request_indexes():
+    """Test that invalid items are skipped and write errors are reported at their request index."""
+    service, collection = _count_service()
+    items = [
+        property_payload("First"),
+        {"name": "Missing everything"},
+        property_payload("Duplicate slug"),
+        property_payload("Last"),
+    ]
+    result = asyncio.run(service.create_properties(items))
+
+    assert [item.ok for item in result.results] == [True, False, False, True]
+    assert "validation error" in result.results[1].error
+    assert result.results[2].error == "duplicate key"
+    assert (result.succeeded, result.failed) == (2, 2)
+    # Only the valid items reach insert_many, in request order
+    assert [doc["name"] for doc in collection.calls[0]] == ["First", "Duplicate slug", "Last"]
+
+
+def test_in_bounds_reports_when_markers_were_capped():
+    """Test that one marker past the limit is read to set the truncated flag."""
+    service, collection = _count_service([{"_id": f"p{i}"} for i in range(3)])
+    markers, truncated = asyncio.run(service.get_properties_in_bounds(17.0, 78.0, 18.0, 79.0, limit=2))
+    assert [marker["_id"] for marker in markers] == ["p0", "p1"]
+    assert truncated
+    assert collection.cursors[-1].limited_to == 3
+    assert collection.calls[-1]["location.geo"]["$geoWithin"]["$geometry"]["type"] == "Polygon"
+
+    markers, truncated = asyncio.run(service.get_properties_in_bounds(17.0, 78.0, 18.0, 79.0, limit=3))
+    assert len(markers) == 3
+    assert not truncated
@@ -0,0 +1,61 @@
+"""Similar properties job unit test module."""
+
+import numpy as np
+
+from mongodb_serve.properties.similar import (
+    feature_matrix,
+    similar_property_updates,
+    top_k_neighbours,
+)
+
+
+def _listing(i, amount, latitude=17.4, bedrooms=3):
+    return {
+        "_id": f"p{i}",
+        "name": f"Listing {i}",
+        "location": {"coordinates": {"latitude": latitude, "longitude": 78.4}},
+        "budget": {"amount": amount},
+        "specifications": {"built_up_area": 1500, "bedrooms": bedrooms},
+    }
+
+
+def test_top_k_neighbours_match_brute_force():
+    """Test that blocked search returns the exact nearest neighbours, nearest first."""
+    features = np.random.default_rng(7).normal(size=(300, 6)).astype(np.float32)
+    indices, distances = top_k_neighbours(features, 5, workers=2)
+
+    exact = np.linalg.norm(features[:, None, :] - features[None, :, :], axis=-1)
+    np.fill_diagonal(exact, np.inf)
+    assert (indices == np.argsort(exact, axis=1)[:, :5]).all()
+    assert np.allclose(distances, np.sort(exact, axis=1)[:, :5], atol=1e-4)
+
+
+def test_top_k_neighbours_never_return_the_row_itself():
+    """Test that k is capped at the number of other rows."""
+    features = np.zeros((3, 2), dtype=np.float32)
+    indices, _ = top_k_neighbours(features, 10)
+    assert indices.shape == (3, 2)
+    assert all(i not in row for i, row in enumerate(indices.tolist()))
+    assert top_k_neighbours(features[:1], 10)[0].shape == (1, 0)
+
+
+def test_feature_matrix_tolerates_missing_values():
+    """Test that missing or constant features do not produce NaNs."""
+    documents = [_listing(0, 5000000), {"_id": "p1", "budget": {}}, _listing(2, 7000000)]
+    assert not np.isnan(feature_matrix(documents)).any()
+
+
+def test_similar_property_updates_set_scores_and_price_differences():
+    """Test that each listing gets its nearest listings with relative prices."""
+    documents = [
+        _listing(0, 5000000),
+        _listing(1, 5200000),
+        _listing(2, 90000000, latitude=17.6, bedrooms=6),
+    ]
+    operations = similar_property_updates(documents, k=1)
+
+    similar = operations[0]._doc["$set"]["similar_properties"]
+    assert operations[0]._filter == {"_id": "p0"}
+    assert similar[0]["property_id"] == "p1"
+    assert similar[0]["price_difference"] == 200000
+    assert 0 < similar[0]["similarity_score"] <= 1
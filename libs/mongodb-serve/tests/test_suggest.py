@@ -0,0 +1,80 @@
+"""Autocomplete index unit test module."""
+
+from mongodb_serve.properties.suggest import SuggestIndex, document_deltas, normalize, property_terms
+
+
+def _index():
+    index = SuggestIndex()
+    index.replace([
+        (("city", "Hyderabad"), 900),
+        (("city", "Bangalore"), 700),
+        (("area", "Jubilee Hills"), 120),
+        (("area", "Banjara Hills"), 80),
+        (("name", "Premium Villa in Jubilee Hills"), 1),
+    ])
+    return index
+
+
+def _texts(suggestions):
+    return [suggestion["text"] for suggestion in suggestions]
+
+
+def test_normalize_folds_case_and_punctuation():
+    """Test that queries and terms are compared case- and punctuation-insensitively."""
+    assert normalize("  Road No. 45,Jubilee-Hills ") == "road no 45 jubilee hills"
+
+
+def test_suggest_matches_prefixes_of_any_word():
+    """Test that whole-term prefixes rank above prefixes of later words."""
+    assert _texts(_index().suggest("hil")) == ["Jubilee Hills", "Banjara Hills", "Premium Villa in Jubilee Hills"]
+    assert _texts(_index().suggest("Hyd")) == ["Hyderabad"]
+
+
+def test_suggest_tolerates_typos():
+    """Test that trigram matching finds terms with transposed or missing letters."""
+    index = _index()
+    assert _texts(index.suggest("jubliee"))[0] == "Jubilee Hills"
+    assert _texts(index.suggest("banglore")) == ["Bangalore"]
+    assert index.suggest("xyz") == []
+
+
+def test_suggest_ranks_popular_terms_first():
+    """Test that equally good matches are ordered by popularity."""
+    assert _texts(_index().suggest("ba")) == ["Bangalore", "Banjara Hills"]
+
+
+def test_add_and_discard_track_usage_counts():
+    """Test that terms appear on first use and disappear when no longer used."""
+    index = _index()
+    index.add_document({"name": "Skyline Towers", "location": {"city": "Pune", "area": "Baner"}})
+    assert index.suggest("sky") == [{"text": "Skyline Towers", "kind": "name", "count": 1}]
+    index.add("city", "Pune")
+
+    index.discard_document({"name": "Skyline Towers", "location": {"city": "Pune", "area": "Baner"}})
+    assert index.suggest("sky") == []
+    assert index.suggest("pune") == [{"text": "Pune", "kind": "city", "count": 1}]
+
+
+def test_batched_counts_match_one_at_a_time():
+    """Test that a large batch leaves the index as per-document writes would."""
+    documents = [{"name": f"Tower {i}", "location": {"city": "Pune", "area": f"Sector {i % 7}"}} for i in range(50)]
+    batched, single = _index(), _index()
+    batched.apply(document_deltas(documents))
+    for document in documents:
+        single.add_document(document)
+    assert batched._suffixes == single._suffixes
+    assert batched._counts == single._counts
+
+    batched.apply(document_deltas(documents[:40], sign=-1))
+    for document in documents[:40]:
+        single.discard_document(document)
+    assert batched._suffixes == single._suffixes == sorted(single._suffixes)
+    assert batched._trigrams == single._trigrams
+    assert _texts(batched.suggest("tower 4")) == ["Tower 40", "Tower 41", "Tower 42", "Tower 43", "Tower 44",
+                                                  "Tower 45", "Tower 46", "Tower 47", "Tower 48", "Tower 49"]
+
+
+def test_property_terms_skip_missing_fields():
+    """Test that partial updates only contribute the fields they change."""
+    assert property_terms({"name": "Villa"}) == [("name", "Villa")]
+    assert property_terms({"location": {"city": "Pune", "area": ""}}) == [("city", "Pune")]